@@ -0,0 +1,37 @@
+// Long-polls api/db-version and writes every new DB version into the db-version-push store,
+// which triggers the update callbacks. Replaces polling all callbacks on a fixed interval.
+(function () {
+    const RETRY_MS = 10000;
+
+    function versionUrl() {
+        const config = JSON.parse(document.getElementById("_dash-config").textContent);
+        return config.requests_pathname_prefix + "api/db-version";
+    }
+
+    async function poll() {
+        const url = versionUrl();
+        let since = null;
+        while (true) {
+            try {
+                const query = since === null ? "" : "?since=" + since;
+                const response = await fetch(url + query, {cache: "no-store"});
+                if (!response.ok) {
+                    throw new Error("HTTP " + response.status);
+                }
+                const version = (await response.json()).version;
+                // Every answer is pushed, also the first: the version probe in AppLayout compares it with
+                // db-version-store, which holds the version the page was built with, and ignores equal ones.
+                // So a change between building the page and this first request is not missed.
+                if (version !== since) {
+                    window.dash_clientside.set_props("db-version-push", {data: version});
+                }
+                since = version;
+            } catch (e) {
+                // Server restarting or unreachable
+                await new Promise((resolve) => setTimeout(resolve, RETRY_MS));
+            }
+        }
+    }
+
+    window.addEventListener("load", poll);
+})();
@@ -1,10 +1,14 @@
+from watchdog.observers.api import BaseObserver
 from watchdog.observers.polling import PollingObserver
 from watchdog.events import FileSystemEventHandler
 from pathlib import Path
 from queue import Queue
+import os
 import threading
+import time
+from collections import deque
 from typing import Any
-from ProjectQCDashboard.config.configuration import PollingIntervalSeconds
+from ProjectQCDashboard.config.configuration import PollingIntervalSeconds, ObserverBackend, FastPollingSeconds
 from ProjectQCDashboard.config.paths import DB_Paths_towatch,external_mqqc, external_meta
 
 from ProjectQCDashboard.config.logger import get_configured_logger
@@ -12,6 +16,15 @@ from ProjectQCDashboard.config.logger import get_configured_logger
 logger = get_configured_logger(__name__)
 # q = Queue()
 
+# Files SQLite writes next to a database while a transaction is open or not yet checkpointed
+SQLITE_COMPANION_SUFFIXES = ("-wal", "-journal")
+
+# File systems where writes by other hosts (or the Docker Desktop host) raise no inotify events
+NETWORK_FILESYSTEMS = {
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "afs", "ceph", "glusterfs", "9p", "virtiofs",
+    "fuse.sshfs", "fuse.glusterfs", "fuse.rclone", "fuse.grpcfuse", "fakeowner", "davfs",
+}
+
 
 
 
@@ -32,6 +45,25 @@ class myHandler(FileSystemEventHandler):
         # Combine all databases to watch
         self.DB = watched_files
 
+    def _watched_database(self, path: str) -> str | None:
+        """
+        Return the watched database a path belongs to, or None.
+
+        A -wal or -journal companion maps to its database: in WAL mode new rows land in the
+        -wal file and the database file itself may not change until the next checkpoint.
+
+        :param path: Path of the file system event
+        :type path: str
+        :return: Path of the watched database or None
+        :rtype: str | None
+        """
+        if path in self.DB:
+            return path
+        for suffix in SQLITE_COMPANION_SUFFIXES:
+            if path.endswith(suffix) and path[:-len(suffix)] in self.DB:
+                return path[:-len(suffix)]
+        return None
+
     def _enqueue_if_watched(self, event: Any) -> None:
         """
         Function to queue the watched event.
@@ -43,15 +75,21 @@ class myHandler(FileSystemEventHandler):
         """
         WatchedEvent = Path(event.src_path).as_posix()
         logger.debug("watched_event_observed", extra={"path": WatchedEvent})
-        if WatchedEvent in self.DB:
-            logger.info("watched_event_queued", extra={"path": WatchedEvent})
-            self.q.put(WatchedEvent)
+        database = self._watched_database(WatchedEvent)
+        if database is not None:
+            logger.debug("watched_event_queued", extra={"path": database, "event_path": WatchedEvent})
+            self.q.put(database)
 
     def on_modified(self, event: Any) -> None:
         self._enqueue_if_watched(event)
 
     def on_created(self, event: Any) -> None:
         self._enqueue_if_watched(event)
+
+    def on_deleted(self, event: Any) -> None:
+        # A rollback journal is deleted when its transaction commits
+        if Path(event.src_path).as_posix() not in self.DB:
+            self._enqueue_if_watched(event)
             
     def on_any_event(self, event: Any) -> None:
         """
@@ -70,6 +108,179 @@ class myHandler(FileSystemEventHandler):
     
            
 
+def _file_state(path: str) -> tuple[int, int] | None:
+    """
+    Return size and modification time of a file, or None if it does not exist.
+
+    :param path: Path to the file
+    :type path: str
+    :return: Tuple of (size, mtime_ns) or None
+    :rtype: tuple[int, int] | None
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def _filesystem_type(path: str) -> str | None:
+    """
+    Return the file system type of the mount a path is on, read from /proc/mounts.
+
+    :param path: Path to a file or directory
+    :type path: str
+    :return: File system type, e.g. "ext4" or "nfs4", or None if it cannot be determined
+    :rtype: str | None
+    """
+    try:
+        with open("/proc/mounts", encoding="utf-8") as mounts:
+            entries = [line.split()[1:3] for line in mounts if len(line.split()) >= 3]
+    except OSError:
+        return None
+
+    real_path = os.path.realpath(path)
+    best: tuple[str, str] | None = None
+    for mount_point, fs_type in entries:
+        # Spaces and tabs in mount points are octal-escaped in /proc/mounts
+        mount_point = mount_point.replace("\\040", " ").replace("\\011", "\t")
+        inside = real_path == mount_point or real_path.startswith(mount_point.rstrip("/") + "/")
+        if inside and (best is None or len(mount_point) > len(best[0])):
+            best = (mount_point, fs_type)
+    return best[1] if best else None
+
+
+def select_backend(watch_dir: str) -> tuple[str, str | None]:
+    """
+    Choose how a directory is watched: kernel notifications (inotify) or stat polling.
+
+    inotify only reports writes made through the local kernel, so network mounts, and mounts
+    whose type cannot be determined, are polled.
+
+    :param watch_dir: The directory to watch
+    :type watch_dir: str
+    :return: Tuple of (backend, file system type), backend is "inotify" or "stat"
+    :rtype: tuple[str, str | None]
+    """
+    fs_type = _filesystem_type(watch_dir)
+    if fs_type is None or fs_type in NETWORK_FILESYSTEMS:
+        return "stat", fs_type
+    try:
+        from watchdog.observers.inotify import InotifyObserver  # noqa: F401  # Linux only
+    except Exception:
+        return "stat", fs_type
+    return "inotify", fs_type
+
+
+class StatWatcher(threading.Thread):
+    def __init__(self, q: Queue[Path | str], watched_files: list[str],
+                 min_interval: float = FastPollingSeconds, max_interval: float = PollingIntervalSeconds) -> None:
+        """
+        Watch the database files with stat() only, in a single thread for all sources.
+
+        Unlike the directory polling of watchdog, no directory is listed: each poll stats the watched
+        files and their -wal/-journal companions, and queues a database whose fingerprint changed.
+        The thread follows the observer interface (start, stop, join, is_alive), so Observer_DBs can
+        manage it like the watchdog observers.
+
+        Each source has its own polling interval: after a change it is polled every min_interval
+        seconds, and every poll without a change doubles the interval up to max_interval. A running
+        instrument is picked up within seconds, an idle one costs a stat call per max_interval.
+
+        :param q: The queue to put the changed database paths into
+        :type q: Queue[Path | str]
+        :param watched_files: Paths of the database files to watch
+        :type watched_files: list[str]
+        :param min_interval: Seconds between two polls of a source that just changed
+        :type min_interval: float
+        :param max_interval: Longest time in seconds between two polls of an idle source
+        :type max_interval: float
+        """
+        super().__init__(name="db-stat-watcher", daemon=True)
+        self.q = q
+        self.watched_files = list(dict.fromkeys(watched_files))
+        self.min_interval = min(min_interval, max_interval)
+        self.max_interval = max_interval
+        self._stop_event = threading.Event()
+        self._states = {path: self._fingerprint(path) for path in self.watched_files}
+
+        now = time.monotonic()
+        self.intervals = {path: self.min_interval for path in self.watched_files}
+        self._next_due = {path: now + self.min_interval for path in self.watched_files}
+        # Times of the changes in the last hour, for the change rate in the logs
+        self._changes: dict[str, deque[float]] = {path: deque() for path in self.watched_files}
+
+    @staticmethod
+    def _fingerprint(path: str) -> tuple[tuple[int, int] | None, ...]:
+        return tuple(_file_state(path + suffix) for suffix in ("", *SQLITE_COMPANION_SUFFIXES))
+
+    def check(self, paths: list[str] | None = None) -> list[str]:
+        """
+        Stat the watched files once and queue the databases that changed since the last check.
+
+        Also schedules the next poll of each checked source (see __init__).
+
+        :param paths: Databases to check; all watched databases if None
+        :type paths: list[str] | None
+        :return: Paths of the databases that changed
+        :rtype: list[str]
+        """
+        changed = []
+        now = time.monotonic()
+        for path in (self.watched_files if paths is None else paths):
+            fingerprint = self._fingerprint(path)
+            is_changed = fingerprint != self._states.get(path)
+            if is_changed:
+                self._states[path] = fingerprint
+                changed.append(path)
+                logger.debug("watched_event_queued", extra={"path": path, "backend": "stat"})
+                self.q.put(path)
+            self._reschedule(path, is_changed, now)
+        return changed
+
+    def _reschedule(self, path: str, changed: bool, now: float) -> None:
+        changes = self._changes[path]
+        if changed:
+            changes.append(now)
+        while changes and changes[0] < now - 3600:
+            changes.popleft()
+
+        previous = self.intervals[path]
+        interval = self.min_interval if changed else min(previous * 2, self.max_interval)
+        self.intervals[path] = interval
+        self._next_due[path] = now + interval
+
+        if interval != previous:
+            logger.info(
+                "stat_watch_interval_changed",
+                extra={"path": path, "interval_seconds": interval, "changes_last_hour": len(changes)},
+            )
+
+    def run(self) -> None:
+        logger.info(
+            "stat_watch_started",
+            extra={"files": self.watched_files, "min_interval_seconds": self.min_interval,
+                   "max_interval_seconds": self.max_interval},
+        )
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            due = [path for path in self.watched_files if self._next_due[path] <= now]
+            if due:
+                try:
+                    self.check(due)
+                except Exception as e:
+                    logger.error("stat_watch_check_failed",
+                                 extra={"error_class": type(e).__name__, "error": str(e)}, exc_info=True)
+                    for path in due:
+                        self._next_due[path] = now + self.intervals[path]
+
+            wait = min(self._next_due.values(), default=now + self.max_interval) - time.monotonic()
+            self._stop_event.wait(max(wait, 0.0))
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
 class Observer_DBs():
     def __init__(self,  q: Queue[Path | str]) -> None:
         """
@@ -83,7 +294,7 @@ class Observer_DBs():
         """
         self.DB_Paths_towatch = [str(DB) for DB in DB_Paths_towatch]
         self.DB_Paths_towatch = list(set(self.DB_Paths_towatch))
-        self.Observer_list: list[PollingObserver] = []
+        self.Observer_list: list[BaseObserver | StatWatcher] = []
         self.q = q
 
     def start_observing(self, stop_event: threading.Event) -> None:
@@ -102,8 +313,15 @@ class Observer_DBs():
         
         watched_files = [Path(db).as_posix() for db in (external_mqqc + [external_meta])]
         handler = myHandler(self.q, watched_files)
+
+        if ObserverBackend == "stat":
+            # One thread stats the watched files directly, the directories are not listed
+            self._start_stat_watcher(watched_files)
+
+        elif ObserverBackend == "auto":
+            self._start_auto(handler, watched_files)
        
-        if len(self.DB_Paths_towatch) >= 1:
+        elif len(self.DB_Paths_towatch) >= 1:
 
             for idx, watch_dir in enumerate(self.DB_Paths_towatch, 1):
                 try:
@@ -135,6 +353,58 @@ class Observer_DBs():
         
         self.close_observations()
 
+    def _start_stat_watcher(self, watched_files: list[str]) -> None:
+        """
+        Start one StatWatcher for the given database files.
+
+        :param watched_files: Paths of the database files to watch
+        :type watched_files: list[str]
+        """
+        try:
+            watcher = StatWatcher(self.q, watched_files)
+            watcher.start()
+            self.Observer_list.append(watcher)
+        except Exception as e:
+            logger.error(
+                "observer_start_failed",
+                extra={"backend": "stat", "files": watched_files,
+                       "error_class": type(e).__name__, "error": str(e)}, exc_info=True)
+
+    def _start_auto(self, handler: myHandler, watched_files: list[str]) -> None:
+        """
+        Watch each directory with inotify where the file system supports it, poll the rest.
+
+        Files in directories that are polled (or whose inotify observer failed to start) share
+        one StatWatcher.
+
+        :param handler: The event handler for the inotify observers
+        :type handler: myHandler
+        :param watched_files: Paths of the database files to watch
+        :type watched_files: list[str]
+        """
+        covered: set[str] = set()
+        for idx, watch_dir in enumerate(self.DB_Paths_towatch, 1):
+            dir_files = [f for f in watched_files if Path(f).parent == Path(watch_dir)]
+            backend, fs_type = select_backend(watch_dir)
+            if backend == "inotify":
+                try:
+                    self.Observer_list.append(start_inotify_observer(handler, watch_dir))
+                    covered.update(dir_files)
+                except Exception as e:
+                    logger.warning(
+                        "inotify_start_failed",
+                        extra={"observer_index": idx, "directory": watch_dir,
+                               "error_class": type(e).__name__, "error": str(e)})
+                    backend = "stat"
+            logger.info(
+                "observer_backend_selected",
+                extra={"observer_index": idx, "directory": watch_dir, "backend": backend, "fs_type": fs_type},
+            )
+
+        polled = [f for f in watched_files if f not in covered]
+        if polled:
+            self._start_stat_watcher(polled)
+
     def close_observations(self) -> None:
         """
         Stop all active observers and clean up resources.
@@ -176,4 +446,23 @@ def start_observer(handler: Any, watch_dir: str) -> PollingObserver:
     )
     return observer
 
-                 
+
+def start_inotify_observer(handler: Any, watch_dir: str) -> BaseObserver:
+    """
+    Start an inotify observer (kernel notifications, no polling) for the specified directory.
+
+    :param handler: The event handler for file system events
+    :type handler: Any
+    :param watch_dir: The directory path to watch
+    :type watch_dir: str
+    :return: The started observer instance
+    :rtype: BaseObserver
+    """
+    from watchdog.observers.inotify import InotifyObserver
+
+    observer = InotifyObserver()
+    observer.schedule(handler, path=watch_dir, recursive=False)
+    observer.start()
+
+    logger.info("directory_watch_started", extra={"directory": watch_dir, "backend": "inotify"})
+    return observer
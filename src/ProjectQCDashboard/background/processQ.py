@@ -1,102 +1,346 @@
 from pathlib import Path
 import threading
 import time
+from datetime import datetime, timedelta
 from queue import Queue, Empty
-from ProjectQCDashboard.config.logger import get_configured_logger
-from ProjectQCDashboard.db.SyncDatabases import sync_database
+from functools import partial
+from typing import Callable
+from ProjectQCDashboard.config.logger import get_configured_logger, correlation
+from ProjectQCDashboard.db.SyncDatabases import sync_database, sync_concurrently, sync_external_sources
 from ProjectQCDashboard.config.paths import  external_mqqc, external_meta, Metadata_DB, MQQC_DB
 from ProjectQCDashboard.db.UpdateDB import DuckDBUpdater
+from ProjectQCDashboard.db.database import publish_snapshot_if_due
+from ProjectQCDashboard.config.configuration import (DeltaSyncMQQC, DirectIngest, StageSources, FlushScheduling,
+                                                     MaintenanceMode, MaintenanceHour, MaintenanceWindowHours)
+from ProjectQCDashboard.config.schemas import FlushSettings
+from ProjectQCDashboard.config.metrics import FLUSHES, FLUSH_SECONDS, QUEUE_DEPTH, PENDING_SOURCES
 
 logger = get_configured_logger(__name__)
 
 
+def _source_kind(path: str) -> str:
+    """
+    Return the kind of a watched database ("mqqc" or "meta"), which selects its FlushScheduling entry.
 
-def process_queue(q: Queue[str|Path], stop_event: threading.Event, sync_external: bool = True,) -> None:
+    :param path: Path of the changed database
+    :type path: str
+    :return: "mqqc", "meta" or "default"
+    :rtype: str
+    """
+    resolved = Path(path).resolve()
+    if external_mqqc and resolved in {Path(p).resolve() for p in external_mqqc}:
+        return "mqqc"
+    if external_meta and resolved == Path(external_meta).resolve():
+        return "meta"
+    return "default"
+
+
+class FlushScheduler:
+    def __init__(self, settings: dict[str, FlushSettings] | None = None) -> None:
+        """
+        Decide when the pending changes of each source are flushed (synced and merged).
+
+        A source is due once it has been quiet for its DebounceSeconds, or at the latest
+        MaxStalenessSeconds after its first pending change, so a steady stream of writes cannot
+        postpone the flush forever. Settings are per source kind (see _source_kind).
+
+        :param settings: Flush settings per source kind; FlushScheduling if None
+        :type settings: dict[str, FlushSettings] | None
+        """
+        self.settings = FlushScheduling if settings is None else settings
+        # per pending source: time of the first and of the last change, and number of changes
+        self.first_event: dict[str, float] = {}
+        self.last_event: dict[str, float] = {}
+        self.event_count: dict[str, int] = {}
+
+    def _settings(self, path: str) -> FlushSettings:
+        return self.settings.get(_source_kind(path)) or self.settings.get("default") or FlushSettings()
+
+    def add(self, path: str, now: float) -> None:
+        """
+        Record a change of a source.
+
+        :param path: Path of the changed database
+        :type path: str
+        :param now: time.monotonic() of the change
+        :type now: float
+        """
+        self.first_event.setdefault(path, now)
+        self.last_event[path] = now
+        self.event_count[path] = self.event_count.get(path, 0) + 1
+
+    def _deadline(self, path: str) -> tuple[float, str]:
+        settings = self._settings(path)
+        debounce = self.last_event[path] + settings.DebounceSeconds
+        staleness = self.first_event[path] + settings.MaxStalenessSeconds
+        return (debounce, "debounce") if debounce <= staleness else (staleness, "max_staleness")
+
+    def due(self, now: float) -> dict[str, str]:
+        """
+        Return the sources whose flush is due, with the reason ("debounce" or "max_staleness").
+
+        :param now: Current time.monotonic()
+        :type now: float
+        :return: Reason keyed by source path
+        :rtype: dict[str, str]
+        """
+        due = {}
+        for path in self.first_event:
+            deadline, reason = self._deadline(path)
+            if deadline <= now:
+                due[path] = reason
+        return due
+
+    def seconds_until_due(self, now: float) -> float | None:
+        """
+        Return the time until the next source is due, or None if nothing is pending.
+
+        :param now: Current time.monotonic()
+        :type now: float
+        :rtype: float | None
+        """
+        if not self.first_event:
+            return None
+        return max(min(self._deadline(path)[0] for path in self.first_event) - now, 0.0)
+
+    def pop(self, paths: list[str], now: float) -> dict[str, float]:
+        """
+        Remove the flushed sources and return how long their changes waited and how many were coalesced.
+
+        :param paths: The sources that are flushed
+        :type paths: list[str]
+        :param now: Current time.monotonic()
+        :type now: float
+        :return: Dict with time_to_flush_ms (oldest change) and coalesced_events
+        :rtype: dict[str, float]
+        """
+        oldest = min(self.first_event[p] for p in paths)
+        events = sum(self.event_count[p] for p in paths)
+        for path in paths:
+            del self.first_event[path], self.last_event[path], self.event_count[path]
+        return {"time_to_flush_ms": round((now - oldest) * 1000, 1), "coalesced_events": events}
+
+    @property
+    def pending(self) -> list[str]:
+        return list(self.first_event)
+
+
+class MaintenanceWindow:
+    def __init__(self, mode: str | None = None, start_hour: int | None = None, hours: int | None = None) -> None:
+        """
+        Decide when the nightly maintenance (see DuckDBUpdater.run_maintenance) runs.
+
+        It is due once per window of `hours` hours starting at `start_hour` (local time). The caller
+        only runs it while no changes are pending, so a busy night skips it.
+
+        :param mode: "off", "checkpoint" or "rebuild"; MaintenanceMode if None
+        :type mode: str | None
+        :param start_hour: Hour the window starts; MaintenanceHour if None
+        :type start_hour: int | None
+        :param hours: Length of the window; MaintenanceWindowHours if None
+        :type hours: int | None
+        """
+        self.mode = MaintenanceMode if mode is None else mode
+        self.start_hour = MaintenanceHour if start_hour is None else start_hour
+        self.hours = MaintenanceWindowHours if hours is None else hours
+        self.last_window: datetime | None = None
+
+    def _window_start(self, now: datetime) -> datetime | None:
+        start = now.replace(hour=self.start_hour, minute=0, second=0, microsecond=0)
+        if start > now:
+            start -= timedelta(days=1)  # a window that started yesterday may reach past midnight
+        return start if now < start + timedelta(hours=self.hours) else None
+
+    def due(self, now: datetime) -> bool:
+        """
+        Return True if now is inside the window and maintenance did not run in this window yet.
+
+        :param now: Current local time
+        :type now: datetime
+        :rtype: bool
+        """
+        if self.mode == "off":
+            return False
+        start = self._window_start(now)
+        return start is not None and start != self.last_window
+
+    def mark_done(self, now: datetime) -> None:
+        self.last_window = self._window_start(now)
+
+
+def catch_up(DuckDB: DuckDBUpdater, sync_external: bool = True) -> None:
+    """
+    Bring a warm-started merged DB up to date: sync all sources, then rebuild it.
+
+    The rebuild bumps the DB version, so the dashboard picks up the new data. Failures are logged,
+    the existing DB keeps being served and the next change flushes as usual.
+
+    :param DuckDB: Updater of the merged DB
+    :type DuckDB: DuckDBUpdater
+    :param sync_external: Sync the external DBs to the internal copies first
+    :type sync_external: bool
+    """
+    with correlation("catch_up"):
+        logger.info("warm_start_catch_up_started")
+        start = time.monotonic()
+        try:
+            if sync_external and not (DirectIngest and DuckDB.staging):
+                synced = sync_external_sources(full=True)
+                if not all(synced.values()):
+                    logger.error("warm_start_sync_failed", extra={"synced": synced})
+            DuckDB.update_db(force_full_refresh=True)
+            publish_snapshot_if_due(force=True)
+            logger.info("warm_start_catch_up_complete",
+                        extra={"duration_ms": round((time.monotonic() - start) * 1000, 1)})
+        except Exception as e:
+            logger.error("warm_start_catch_up_failed",
+                         extra={"error_class": type(e).__name__, "error": str(e)}, exc_info=True)
+
+
+def process_queue(q: Queue[str|Path], stop_event: threading.Event, sync_external: bool = True,
+                  updater: DuckDBUpdater | None = None, catch_up_first: bool = False) -> None:
     """
         Process queue messages in a background thread with debounce logic.
 
         Listens for file system events indicating database changes, determines which database changed,
         triggers syncing of external to internal databases, and updates the merged DuckDB database.
+        When a changed source is flushed is decided by FlushScheduler (debounce plus a maximum staleness).
         Runs until the stop_event is set. Handles exceptions and ensures observer cleanup on exit.
 
         :param q: Queue to process
         :type q:  Queue[str|Path]
         :param stop_event: Event to signal thread termination
         :type stop_event: threading.Event
+        :param sync_external: Sync the external DBs to the internal copies before merging
+        :type sync_external: bool
+        :param updater: Updater used for the merges, e.g. the one that built the DB at startup.
+            Created from the internal copies if None.
+        :type updater: DuckDBUpdater | None
+        :param catch_up_first: Run catch_up before processing the queue (warm start)
+        :type catch_up_first: bool
     """
-    DEBOUNCE_SECONDS = 5.0  # quiet period before flushing
-    DuckDB = DuckDBUpdater(MQQC_DB, Metadata_DB)
+    DuckDB = updater if updater is not None else DuckDBUpdater(MQQC_DB, Metadata_DB, staging=StageSources)
+    scheduler = FlushScheduler()
+    maintenance = MaintenanceWindow()
 
-    pending: set[str] = set()
-    last_event_time: float | None = None
+    if catch_up_first:
+        # Changes that arrive meanwhile wait in the queue and are flushed afterwards
+        catch_up(DuckDB, sync_external)
 
     while not stop_event.is_set():
-        # Pick a timeout: short if we have pending work, long if idle.
-        timeout = 0.5 if pending else 1.0
+        # Wait for the next change, but not past the moment a pending source is due.
+        until_due = scheduler.seconds_until_due(time.monotonic())
+        timeout = 1.0 if until_due is None else min(max(until_due, 0.05), 1.0)
 
         try:
             val = q.get(timeout=timeout)
-            pending.add(str(val))
-            last_event_time = time.monotonic()
+            scheduler.add(str(val), time.monotonic())
             logger.debug(
                 "queue_item_enqueued",
-                extra={"item": str(val), "pending_count": len(pending)},
+                extra={"item": str(val), "pending_count": len(scheduler.pending), "queue_depth": q.qsize()},
             )
-            continue  # go back, try to drain more
+            # No continue here: under a steady stream of events the due check must still run
         except Empty:
             pass  # fall through to the "is it time to flush?" check
 
-        # If we have pending events and it's been quiet long enough, flush.
-        if pending and last_event_time is not None:
-            quiet_for = time.monotonic() - last_event_time
-            if quiet_for < DEBOUNCE_SECONDS:
-                continue  # still in the quiet window, keep waiting
+        now = time.monotonic()
+        due = scheduler.due(now)
+        QUEUE_DEPTH.set(q.qsize())
+        PENDING_SOURCES.set(len(scheduler.pending))
+
+        # Nightly maintenance only runs while the incremental path has nothing to do
+        if not due and not scheduler.pending and q.empty() and maintenance.due(datetime.now()):
+            maintenance.mark_done(datetime.now())
+            with correlation("maintenance"):
+                try:
+                    if (maintenance.mode == "rebuild" and sync_external and DeltaSyncMQQC
+                            and not (DirectIngest and DuckDB.staging)):
+                        # Delta syncs miss edits to older source rows; a nightly full backup brings them in
+                        # and the rebuild merges them (a checkpoint would leave them unmerged)
+                        synced = sync_external_sources(full=True)
+                        if not all(synced.values()):
+                            logger.error("maintenance_sync_failed", extra={"synced": synced})
+                    DuckDB.run_maintenance(maintenance.mode)
+                except Exception as e:
+                    logger.error("maintenance_failed", extra={"error_class": type(e).__name__, "error": str(e)}, exc_info=True)
 
-            # Drain any remaining events without blocking
+        if due:
+            # Drain any remaining events without blocking; they are coalesced into this or a later flush
             MAX_DRAIN = 1000
             for _ in range(MAX_DRAIN):
                 try:
-                    pending.add(str(q.get_nowait()))
+                    scheduler.add(str(q.get_nowait()), now)
                 except Empty:
                     break
 
-            logger.info(
-                "queue_flush_started",
-                extra={"pending_count": len(pending)},
-            )
-            try:
-                # Sync each DB at most once per flush
-                mqqc_set = {Path(p).resolve() for p in external_mqqc} if external_mqqc else None
-                meta_path = Path(external_meta).resolve()  if external_meta else None
-                synced_mqqc = False
-                synced_meta = False
-                if sync_external:
-                    for p in pending:
-                        rp = Path(p).resolve()
-                        if not mqqc_set or not meta_path:
-                            logger.warning(
-                                "external_sync_missing_configuration",
-                                extra={
-                                    "mqqc_set": [str(p) for p in mqqc_set] if mqqc_set else None,
-                                    "meta_path": str(meta_path) if meta_path else None,
-                                },
-                            )
-                        elif mqqc_set and rp in mqqc_set and not synced_mqqc:
-                            synced_mqqc = sync_database(external_mqqc, MQQC_DB)
-                        elif meta_path and rp == meta_path and not synced_meta:
-                            synced_meta = sync_database(external_meta, Metadata_DB)
-                        elif rp not in mqqc_set and rp != meta_path:
-                            logger.warning(f"Unknown DB file changed: {p}")
-
-                    if synced_mqqc or synced_meta:
-                        DuckDB.update_db()   
+            queue_depth = q.qsize()
+            pending = list(due)
+            flush_stats = scheduler.pop(pending, now)
+
+            # Everything logged for this flush, also from the sync threads, carries the same correlation_id
+            with correlation("flush"):
+                logger.info(
+                    "queue_flush_started",
+                    extra={"pending_count": len(pending), "sources": pending, "reasons": sorted(set(due.values())),
+                           "queue_depth": queue_depth, "still_pending": len(scheduler.pending), **flush_stats},
+                )
+                outcome = "error"
+                try:
+                    mqqc_set = {Path(p).resolve() for p in external_mqqc} if external_mqqc else None
+                    meta_path = Path(external_meta).resolve()  if external_meta else None
+                    # Sources whose fingerprint did not change are skipped; merge only if something was copied
+                    copied: list[str] = []
+                    if DuckDB.staging and DirectIngest:
+                        # Direct ingest: the merge copies the changed external DBs into DuckDB itself
+                        if DuckDB.sources_changed():
+                            DuckDB.update_db()
+                        else:
+                            logger.info("queue_flushed_sources_unchanged")
+                    elif sync_external:
+                        syncs: dict[str, Callable[[], bool]] = {}
+                        for p in pending:
+                            rp = Path(p).resolve()
+                            if not mqqc_set or not meta_path:
+                                logger.warning(
+                                    "external_sync_missing_configuration",
+                                    extra={
+                                        "mqqc_set": [str(p) for p in mqqc_set] if mqqc_set else None,
+                                        "meta_path": str(meta_path) if meta_path else None,
+                                    },
+                                )
+                            elif mqqc_set and rp in mqqc_set:
+                                syncs["mqqc"] = partial(sync_database, external_mqqc, MQQC_DB, skip_unchanged=True,
+                                                        copied=copied, delta=DeltaSyncMQQC)
+                            elif meta_path and rp == meta_path:
+                                syncs["meta"] = partial(sync_database, external_meta, Metadata_DB, skip_unchanged=True,
+                                                        copied=copied)
+                            elif rp not in mqqc_set and rp != meta_path:
+                                logger.warning(f"Unknown DB file changed: {p}")
+
+                        # Each DB is synced at most once per flush, MQQC and metadata at the same time
+                        synced = sync_concurrently(syncs)
+                        synced_mqqc = synced.get("mqqc", False)
+                        synced_meta = synced.get("meta", False)
+
+                        if (synced_mqqc or synced_meta) and copied:
+                            # With StageSources the merge first refreshes the DuckDB copies of the changed DBs
+                            DuckDB.update_db()   
+                        elif synced_mqqc or synced_meta:
+                            logger.info("queue_flushed_sources_unchanged")
+                        else:
+                            logger.info("queue_flushed_no_sync_performed")     
                     else:
-                        logger.info("queue_flushed_no_sync_performed")     
-                else:
-                    DuckDB.update_db()
-
-            except Exception as e:
-                logger.error( "batch_processing_failed",extra={"error_class": type(e).__name__, "error": str(e)}, exc_info=True)
-            finally:
-                pending.clear()
-                last_event_time = None
\ No newline at end of file
+                        DuckDB.update_db()
+
+                    outcome = "ok"
+                except Exception as e:
+                    logger.error( "batch_processing_failed",extra={"error_class": type(e).__name__, "error": str(e)}, exc_info=True)
+                finally:
+                    duration = time.monotonic() - now
+                    FLUSHES.inc(outcome=outcome)
+                    FLUSH_SECONDS.observe(duration)
+                    logger.info("queue_flush_finished", extra={
+                        "sources": pending, "duration_ms": round(duration * 1000, 1)})
+
+        # Multi-worker writer: snapshots are copied here, between merges, so none is taken mid-merge
+        publish_snapshot_if_due()
@@ -1,3 +1,4 @@
+import os
 from ProjectQCDashboard.config.loadParams import PARAMS
 from collections import OrderedDict
 
@@ -8,9 +9,32 @@ PollingIntervalSeconds = PARAMS.processing.PollingIntervalSeconds
 ThresholdForTwoColumnsOfGraphs = PARAMS.processing.ThresholdForTwoColumnsOfGraphs
 ThresholdForRollingMean = PARAMS.processing.ThresholdForRollingMean
 UpdateLastXEntries = PARAMS.processing.UpdateLastXEntries
+FigureWorkers = PARAMS.processing.FigureWorkers
+DeltaSyncMQQC = PARAMS.processing.DeltaSyncMQQC
+SyncWorkers = PARAMS.processing.SyncWorkers
+DirectIngest = PARAMS.processing.DirectIngest
+StageSources = PARAMS.processing.StageSources
+ObserverBackend = PARAMS.processing.ObserverBackend
+FastPollingSeconds = PARAMS.processing.FastPollingSeconds
+BackupPagesPerStep = PARAMS.processing.BackupPagesPerStep
+BackupSleepSeconds = PARAMS.processing.BackupSleepSeconds
+FlushScheduling = PARAMS.processing.FlushScheduling
+MaintenanceMode = PARAMS.processing.MaintenanceMode
+MaintenanceHour = PARAMS.processing.MaintenanceHour
+MaintenanceWindowHours = PARAMS.processing.MaintenanceWindowHours
+WarmStartMaxAgeHours = PARAMS.processing.WarmStartMaxAgeHours
+MultiWorkerServing = PARAMS.processing.MultiWorkerServing
+LongPollSeconds = PARAMS.processing.LongPollSeconds
+SnapshotMinIntervalSeconds = PARAMS.processing.SnapshotMinIntervalSeconds
+# PROFILE_MERGES=1 switches profiling on without editing params.yaml, e.g. for one container run
+ProfileMerges = PARAMS.processing.ProfileMerges or os.environ.get("PROFILE_MERGES", "").lower() in {"1", "true", "yes"}
+ProfilesKept = PARAMS.processing.ProfilesKept
 
 plot_config_seq = PARAMS.ColumnsDatabase.PLOT_CONFIG
 PLOT_CONFIG = OrderedDict(plot_config_seq)
 DB_CONFIG = PARAMS.ColumnsDatabase.DB_CONFIG
 
+# Column names of the plotted metrics in project_data; iQC keys read the "_iQC" suffixed column
+METRIC_COLUMNS = [value[0] + "_iQC" if key.endswith("_iQC") else value[0] for key, value in PLOT_CONFIG.items()]
+
 ROWS_Table = list(PARAMS.ColumnsDatabase.TABLE_CONFIG)
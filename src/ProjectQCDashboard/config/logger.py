@@ -1,6 +1,15 @@
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from ProjectQCDashboard.config.paths import log_filepath
+import atexit
+import copy
+import os
+import queue
 import sys
+import contextvars
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, ParamSpec, TypeVar
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from ProjectQCDashboard.config.RunningContainer import _is_running_in_container
@@ -14,20 +23,25 @@ DateFormat = "%Y-%m-%d %H:%M:%S"
 loggerLevel = PARAMS.LOG_LEVEL
 
 # Configure timezone for log timestamps
-def berlin_time(*_ignored: object) -> time.struct_time:
+BERLIN_TZ = ZoneInfo('Europe/Berlin')
+
+def berlin_time(timestamp: float | None = None) -> time.struct_time:
     """
     Convert log timestamps to Berlin time (handles CET/CEST automatically).
 
     This function is used as a converter for log formatters to ensure all log timestamps
     are in the Europe/Berlin timezone, including daylight saving time adjustments.
+    Records are formatted by the background log writer, so the record's own creation time
+    is converted, not the time of writing.
 
-    :param _ignored: Ignored arguments (for compatibility)
-    :type _ignored: object
-    :return: The current time in Berlin timezone as a struct_time
+    :param timestamp: Seconds since the epoch (record.created); the current time if None
+    :type timestamp: float | None
+    :return: The time in Berlin timezone as a struct_time
     :rtype: time.struct_time
     """
-    berlin_tz = ZoneInfo('Europe/Berlin')
-    return datetime.now(berlin_tz).timetuple()
+    if timestamp is None:
+        return datetime.now(BERLIN_TZ).timetuple()
+    return datetime.fromtimestamp(timestamp, BERLIN_TZ).timetuple()
 
 formatter = JsonFormatter(
     fmt= logging_str,
@@ -35,6 +49,41 @@ formatter = JsonFormatter(
 )
 formatter.converter = berlin_time
 
+# Correlation ID of the current queue flush or HTTP request; every log record written while it is set carries it
+correlation_id: contextvars.ContextVar[str | None] = contextvars.ContextVar("correlation_id", default=None)
+
+
+class CorrelationIdFilter(logging.Filter):
+    """Add the current correlation ID (if any) to each log record as `correlation_id`."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        cid = correlation_id.get()
+        if cid is not None and not hasattr(record, "correlation_id"):
+            record.correlation_id = cid
+        return True
+
+
+correlation_filter = CorrelationIdFilter()
+
+
+class StructuredQueueHandler(QueueHandler):
+    """
+    Queue handler that hands the record to the log writer thread without formatting it.
+
+    The default QueueHandler formats the record into a plain string, which would lose the JSON fields.
+    Only what may change after the call is resolved here: the message arguments and the traceback.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
 # Always set up file logging
 # In container with Gunicorn: this adds file handler alongside Gunicorn's handlers
 # In local mode: this is the primary logging setup
@@ -43,23 +92,51 @@ file_handler.setFormatter(formatter)
 stream_handler = logging.StreamHandler(sys.stdout)
 stream_handler.setFormatter(formatter)
 
+# Loggers only put records on this queue; a background thread formats them and writes to disk/stdout,
+# so render and merge threads never wait for log I/O. The correlation ID is added before queueing,
+# while the record is still in the thread that logged it.
+log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+queue_handler = StructuredQueueHandler(log_queue)
+queue_handler.addFilter(correlation_filter)
+
 if _is_running_in_container():
-    # In container with Gunicorn: use Gunicorn's logger and add file handler
+    # In container with Gunicorn: use Gunicorn's logger and add the file handler behind the queue
     gunicorn_logger = logging.getLogger('gunicorn.error')
-    gunicorn_logger.addHandler(file_handler)
     gunicorn_logger.setLevel(loggerLevel)
-    # Also update Gunicorn's existing handlers to use Berlin time
+    # Gunicorn's own handlers stay in place (it reopens them on USR1), using Berlin time and the correlation ID
     for handler in gunicorn_logger.handlers:
         handler.setFormatter(formatter)
+        handler.addFilter(correlation_filter)
+    output_handlers: list[logging.Handler] = [file_handler]
+    gunicorn_logger.addHandler(queue_handler)
 else:
     # Local development: set up basic config with console and file
+    output_handlers = [file_handler, stream_handler]
     logging.basicConfig(
         level=loggerLevel,
-        handlers=[
-            file_handler,
-            stream_handler
-        ]
+        handlers=[queue_handler]
     )
+
+log_listener: QueueListener | None = None
+
+
+def start_log_writer() -> None:
+    """Start the background thread that writes queued log records (again after a fork)."""
+    global log_listener
+    log_listener = QueueListener(log_queue, *output_handlers, respect_handler_level=True)
+    log_listener.start()
+
+
+def stop_log_writer() -> None:
+    """Write all queued records and stop the background writer, e.g. at exit."""
+    if log_listener is not None and log_listener._thread is not None:
+        log_listener.stop()
+
+
+start_log_writer()
+atexit.register(stop_log_writer)
+# A forked Gunicorn worker does not inherit the writer thread
+os.register_at_fork(after_in_child=start_log_writer)
     
 
 def get_configured_logger(name: str | None = None) -> logging.Logger:
@@ -80,3 +157,78 @@ def get_configured_logger(name: str | None = None) -> logging.Logger:
     else:
         # Use standard logger for local development
         return logging.getLogger(name or __name__)
+
+
+@contextmanager
+def correlation(prefix: str) -> Iterator[str]:
+    """
+    Set a new correlation ID for everything logged inside the block, e.g. one queue flush.
+
+    :param prefix: Kind of unit of work, e.g. "flush" or "req"
+    :type prefix: str
+    :return: The correlation ID
+    :rtype: Iterator[str]
+    """
+    token = correlation_id.set(f"{prefix}-{uuid.uuid4().hex[:12]}")
+    try:
+        yield correlation_id.get() or ""
+    finally:
+        correlation_id.reset(token)
+
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+def propagate_correlation(fn: Callable[P, R]) -> Callable[P, R]:
+    """
+    Wrap fn so that it runs with the caller's correlation ID, for work handed to a thread pool.
+
+    :param fn: Function to run in another thread
+    :type fn: Callable
+    :return: Wrapped function
+    :rtype: Callable
+    """
+    cid = correlation_id.get()
+
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        token = correlation_id.set(cid)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            correlation_id.reset(token)
+
+    return wrapper
+
+
+@contextmanager
+def span(logger: logging.Logger, name: str, level: int = logging.INFO, **fields: Any) -> Iterator[dict[str, Any]]:
+    """
+    Time a block and log it as one `span_finished` record with `span`, `duration_ms` and `status`.
+
+    The yielded dict is logged too, so the block can add results such as row counts.
+    After the block it also holds `duration_ms`.
+    Can also be used as a decorator: ``@span(logger, "name")``.
+
+    :param logger: Logger of the calling module
+    :type logger: logging.Logger
+    :param name: Name of the timed stage
+    :type name: str
+    :param level: Log level of the record
+    :type level: int
+    :param fields: Additional fields to log
+    :type fields: Any
+    :return: Dict of fields logged with the span
+    :rtype: Iterator[dict[str, Any]]
+    """
+    record: dict[str, Any] = dict(fields)
+    start = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record.update(status="error", error_class=type(e).__name__)
+        raise
+    finally:
+        record.setdefault("status", "ok")
+        record["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        logger.log(level, "span_finished", extra={"span": name, **record})
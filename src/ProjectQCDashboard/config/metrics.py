@@ -0,0 +1,169 @@
+import math
+import threading
+from abc import ABC, abstractmethod
+from ProjectQCDashboard.config.logger import get_configured_logger
+
+logger = get_configured_logger(__name__)
+
+# Minimal in-process metrics in the Prometheus text format, served on /metrics (see AppLayout).
+# Every Gunicorn worker keeps its own values; the writer worker is the one that flushes, syncs and merges.
+
+LabelKey = tuple[tuple[str, str], ...]
+
+_registry: list["_Metric"] = []
+_registry_lock = threading.Lock()
+
+
+def _label_key(labels: dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = [*key, *extra]
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help_text: str) -> None:
+        """
+        :param name: Metric name, prefixed with projectqc_
+        :type name: str
+        :param help_text: Description shown in the HELP line
+        :type help_text: str
+        """
+        self.name = f"projectqc_{name}"
+        self.help_text = help_text
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    @abstractmethod
+    def samples(self) -> list[str]:
+        """Sample lines of this metric, one per label set."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value, e.g. number of flushes."""
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        super().__init__(name, help_text)
+        self._values: dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: object) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(key)} {_format_value(v)}" for key, v in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, e.g. queue depth."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        super().__init__(name, help_text)
+        self._values: dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: object) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def value(self, **labels: object) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(key)} {_format_value(v)}" for key, v in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (seconds by default) in cumulative buckets."""
+    kind = "histogram"
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help_text)
+        self.buckets = (*sorted(buckets), math.inf)
+        # per label set: bucket counts, sum, count
+        self._values: dict[LabelKey, tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: object) -> int:
+        with self._lock:
+            entry = self._values.get(_label_key(labels))
+            return entry[2] if entry else 0
+
+    def samples(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    le = (("le", _format_value(bound)),)
+                    lines.append(f"{self.name}_bucket{_format_labels(key, le)} {bucket_count}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+def render_metrics() -> str:
+    """
+    Render all registered metrics in the Prometheus text exposition format.
+
+    :return: Metrics text
+    :rtype: str
+    """
+    with _registry_lock:
+        metrics = list(_registry)
+    return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# Pipeline
+FLUSHES = Counter("queue_flushes_total", "Queue flushes, by outcome")
+FLUSH_SECONDS = Histogram("queue_flush_seconds", "Duration of a queue flush (sync and merge)")
+QUEUE_DEPTH = Gauge("queue_depth", "Change events waiting in the queue")
+PENDING_SOURCES = Gauge("queue_pending_sources", "Changed sources waiting for their flush deadline")
+SYNC_BYTES = Counter("sync_bytes_total", "Bytes copied from a source database, by source")
+SYNC_SECONDS = Histogram("sync_seconds", "Duration of a source database sync, by source and mode")
+SYNC_THROUGHPUT = Gauge("sync_throughput_mb_per_second", "Throughput of the last full copy of a source database, by source")
+MERGE_ROWS = Counter("merge_rows_changed_total", "Rows written to project_data by the merge, by mode")
+MERGE_SECONDS = Histogram("merge_seconds", "Duration of the DuckDB merge, by mode")
+DB_VERSION = Gauge("db_version", "Current version of the merged database")
+LAST_UPDATE = Gauge("db_last_update_timestamp_seconds", "Unix time of the last merged database update")
+
+# Serving
+CALLBACK_SECONDS = Histogram("callback_seconds", "Latency of Dash callback requests, by callback output")
+DUCKDB_OPENS = Counter("duckdb_connections_opened_total", "DuckDB connections opened on the merged database, by purpose")
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups, by cache and result (hit or miss)")
@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic import BaseModel, Field
 
 class EnvPaths(BaseModel):
@@ -12,11 +13,34 @@ class EnvPaths(BaseModel):
     mqqc_db_dir_2: str
     meta_db_dir: str
 
+class FlushSettings(BaseModel):
+    DebounceSeconds: float = Field(default=5.0, ge=0)
+    MaxStalenessSeconds: float = Field(default=30.0, gt=0)
+
 class ProcessingConfig(BaseModel):
     PollingIntervalSeconds: int = Field(gt=0)
     ThresholdForTwoColumnsOfGraphs: int = Field(gt=0)
     ThresholdForRollingMean: int = Field(gt=1)
     UpdateLastXEntries: int = Field(gt=1)
+    FigureWorkers: int = Field(default=1, ge=1)
+    DeltaSyncMQQC: bool = False
+    SyncWorkers: int = Field(default=1, ge=1)
+    DirectIngest: bool = False
+    StageSources: bool = False
+    ObserverBackend: Literal["auto", "stat", "directory"] = "directory"
+    FastPollingSeconds: int = Field(default=5, gt=0)
+    BackupPagesPerStep: int = Field(default=-1)
+    BackupSleepSeconds: float = Field(default=0, ge=0)
+    FlushScheduling: dict[str, FlushSettings] = Field(default_factory=dict)
+    MaintenanceMode: Literal["off", "checkpoint", "rebuild"] = "off"
+    MaintenanceHour: int = Field(default=3, ge=0, le=23)
+    MaintenanceWindowHours: int = Field(default=2, ge=1, le=24)
+    WarmStartMaxAgeHours: float = Field(default=0, ge=0)
+    MultiWorkerServing: bool = False
+    LongPollSeconds: int = Field(default=25, gt=0)
+    SnapshotMinIntervalSeconds: float = Field(default=30, ge=0)
+    ProfileMerges: bool = False
+    ProfilesKept: int = Field(default=20, ge=1)
 
 class DataConfig(BaseModel):
     Tables_Metadata_db: list[str]
@@ -1,7 +1,16 @@
 import os
 import tempfile
-from ProjectQCDashboard.config.logger import get_configured_logger
-from ProjectQCDashboard.config.paths import internal_path
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable
+from ProjectQCDashboard.background.observer import NETWORK_FILESYSTEMS, _filesystem_type
+from ProjectQCDashboard.config.logger import get_configured_logger, span, propagate_correlation
+from ProjectQCDashboard.config.metrics import SYNC_BYTES, SYNC_SECONDS, SYNC_THROUGHPUT, CACHE_REQUESTS
+from ProjectQCDashboard.config.paths import internal_path, external_mqqc, external_meta, MQQC_DB, Metadata_DB
+from ProjectQCDashboard.config.configuration import (UpdateLastXEntries, SyncWorkers, BackupPagesPerStep, BackupSleepSeconds,
+                                                     DeltaSyncMQQC)
 from pathlib import Path
 import sqlite3
 from contextlib import closing
@@ -12,17 +21,367 @@ logger = get_configured_logger(__name__)
 TEMP_PREFIX = "synctmp_"
 TEMP_SUFFIX = ".tmp"
 
-def sync_database(source_db_path: str | Path | list[str] | None, dest_db_path: str | Path | list[str] | None) -> bool:
+_fingerprint_lock = threading.Lock()
+
+# Fingerprint of each source at its last successful sync, keyed by source path
+_source_fingerprints: dict[str, tuple[int, ...]] = {}
+
+# One read-only connection per source, only used for PRAGMA data_version: its value is only
+# comparable between calls on the same connection. Stored with the (st_dev, st_ino) of the file
+# it was opened on, so it is reopened when the file is replaced (e.g. by os.replace).
+# Connections are only kept for sources on local file systems: an open handle on a network share
+# (e.g. the instrument PC's SMB share) blocks the instrument software from replacing the file.
+_fingerprint_connections: dict[str, tuple[sqlite3.Connection, tuple[int, int]]] = {}
+
+# Whether a source is on a local file system, keyed by source path
+_local_sources: dict[str, bool] = {}
+
+
+def _on_local_filesystem(src: str) -> bool:
+    """
+    Return whether a source is on a local file system; unknown file systems count as network mounts.
+
+    :param src: Path to the source database
+    :type src: str
+    :return: True if the file system is known and not a network mount
+    :rtype: bool
+    """
+    local = _local_sources.get(src)
+    if local is None:
+        fs_type = _filesystem_type(src)
+        local = fs_type is not None and fs_type not in NETWORK_FILESYSTEMS
+        _local_sources[src] = local
+    return local
+
+
+def source_fingerprint(src_path: str | Path) -> tuple[int, ...]:
+    """
+    Cheap change fingerprint of an SQLite source, read without copying any pages.
+
+    Combines the file size and mtime, the file change counter from the SQLite header
+    (bytes 24-27, bumped by every commit in rollback-journal mode), size and mtime of a
+    ``-wal`` file (WAL commits do not touch the main file) and, for sources on a local file
+    system, ``PRAGMA data_version`` of a connection kept open per source. On network mounts no
+    connection is kept and the header and ``-wal`` stat alone are used. The inode is part of the
+    fingerprint, so replacing the file counts as a change; the connection is then reopened on
+    the new file.
+
+    :param src_path: Path to the source database
+    :type src_path: str | Path
+    :return: Tuple that changes whenever the database content may have changed
+    :rtype: tuple[int, ...]
+    :raises OSError: If the source cannot be read
+    """
+    src = str(src_path)
+    stat = os.stat(src)
+    with open(src, "rb") as f:
+        header = f.read(100)
+    change_counter = int.from_bytes(header[24:28], "big") if len(header) >= 28 else 0
+
+    try:
+        wal_stat = os.stat(f"{src}-wal")
+        wal = (wal_stat.st_size, wal_stat.st_mtime_ns)
+    except OSError:
+        wal = (0, 0)
+
+    file_id = (stat.st_dev, stat.st_ino)
+    with _fingerprint_lock:
+        cached = _fingerprint_connections.get(src)
+        if cached is not None and cached[1] != file_id:
+            # Replaced file: the old connection still reads the unlinked file and keeps its space allocated
+            _fingerprint_connections.pop(src)
+            cached[0].close()
+            cached = None
+        if not _on_local_filesystem(src):
+            return (stat.st_size, stat.st_mtime_ns, stat.st_ino, change_counter, *wal, 0)
+        if cached is None:
+            # Read-only, same as the sync itself: the instrument database is never written here.
+            cached = (sqlite3.connect(f"file:{src}?mode=ro", uri=True, check_same_thread=False), file_id)
+            _fingerprint_connections[src] = cached
+        con = cached[0]
+        try:
+            # fetchall steps the statement to completion, so no read lock stays on the source
+            data_version = int(con.execute("PRAGMA data_version").fetchall()[0][0])
+        except sqlite3.Error:
+            # e.g. the file is corrupt or gone; reopen on next call
+            _fingerprint_connections.pop(src, None)
+            con.close()
+            data_version = -1
+
+    return (stat.st_size, stat.st_mtime_ns, stat.st_ino, change_counter, *wal, data_version)
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _delta_sync(src_path: str, dst_path: str, tail_rows: int = UpdateLastXEntries) -> int | None:
+    """
+    Bring an existing internal copy up to date by copying only the rows the source gained.
+
+    Per table, the last ``tail_rows`` rows of the copy and everything after them are replaced by the
+    source rows with the same rowids, so appended rows and edits to recent rows both arrive.
+    All tables are updated in one transaction on the copy, reading one consistent snapshot of the
+    source, which is attached read-only.
+
+    Returns None, without changing the copy, when a full backup is needed instead: the schema
+    differs, a table has no rowid, or the source was rewritten (rows removed or the first row or
+    the row at the watermark differ between source and copy).
+
+    :param src_path: Path to the source database
+    :type src_path: str
+    :param dst_path: Path to the existing internal copy
+    :type dst_path: str
+    :param tail_rows: Number of trailing rows per table that are copied again
+    :type tail_rows: int
+    :return: Number of rows written, or None if a full backup is needed
+    :rtype: int | None
+    """
+    with closing(sqlite3.connect(f"file:{dst_path}", uri=True, isolation_level=None)) as dst:
+        # Read-only attach: the delta sync can never write to the external instrument database
+        dst.execute("ATTACH DATABASE ? AS src", (f"file:{src_path}?mode=ro",))
+        dst.execute("BEGIN")
+        try:
+            schema_sql = "SELECT type, name, tbl_name, sql FROM {db}.sqlite_master WHERE name NOT LIKE 'sqlite_%' ORDER BY type, name"
+            src_schema = dst.execute(schema_sql.format(db="src")).fetchall()
+            if src_schema != dst.execute(schema_sql.format(db="main")).fetchall():
+                logger.info("db_delta_sync_fallback", extra={"src": src_path, "reason": "schema_changed"})
+                dst.execute("ROLLBACK")
+                return None
+
+            rows_written = 0
+            for obj_type, table, _, sql in src_schema:
+                if obj_type != "table":
+                    continue
+                if "WITHOUT ROWID" in (sql or "").upper():
+                    logger.info("db_delta_sync_fallback", extra={"src": src_path, "table": table, "reason": "without_rowid"})
+                    dst.execute("ROLLBACK")
+                    return None
+
+                t = _quote(table)
+                src_max = dst.execute(f"SELECT MAX(rowid) FROM src.{t}").fetchone()[0]
+                dst_min, dst_max = dst.execute(f"SELECT MIN(rowid), MAX(rowid) FROM main.{t}").fetchone()
+
+                if dst_max is not None:
+                    # rowid of the last row that is kept as is; None if the whole table is copied again
+                    tail = dst.execute(f"SELECT rowid FROM main.{t} ORDER BY rowid DESC LIMIT 1 OFFSET ?", (tail_rows,)).fetchone()
+                    watermark = tail[0] if tail else None
+                    checks = [dst_min] + ([watermark] if watermark is not None else [])
+                    rewritten = src_max is None or src_max < dst_max or any(
+                        dst.execute(f"SELECT * FROM main.{t} WHERE rowid = ?", (rowid,)).fetchone()
+                        != dst.execute(f"SELECT * FROM src.{t} WHERE rowid = ?", (rowid,)).fetchone()
+                        for rowid in checks)
+                    if rewritten:
+                        logger.info("db_delta_sync_fallback", extra={"src": src_path, "table": table, "reason": "rewritten"})
+                        dst.execute("ROLLBACK")
+                        return None
+                else:
+                    watermark = None
+
+                # Keep rowids identical to the source so the next watermark lines up.
+                # An INTEGER PRIMARY KEY is the rowid itself and is copied with the columns.
+                info = dst.execute(f"PRAGMA main.table_info({t})").fetchall()
+                pk_cols = [col for col in info if col[5] > 0]
+                rowid_alias = len(pk_cols) == 1 and str(pk_cols[0][2]).upper() == "INTEGER"
+                columns = ", ".join(([] if rowid_alias else ["rowid"]) + [_quote(col[1]) for col in info])
+
+                where = "" if watermark is None else "WHERE rowid > ?"
+                params = () if watermark is None else (watermark,)
+                dst.execute(f"DELETE FROM main.{t} {where}", params)
+                cur = dst.execute(f"INSERT INTO main.{t} ({columns}) SELECT {columns} FROM src.{t} {where}", params)
+                rows_written += max(cur.rowcount, 0)
+
+            dst.execute("COMMIT")
+            return rows_written
+
+        except Exception:
+            if dst.in_transaction:
+                dst.execute("ROLLBACK")
+            raise
+
+
+def _throttled_backup(src: sqlite3.Connection, dst: sqlite3.Connection, src_path: str,
+                      pages: int | None = None, sleep: float | None = None) -> dict[str, float]:
+    """
+    Copy a database with the SQLite backup API in steps of `pages` pages, pausing between steps.
+
+    Chunking keeps each read burst on the (shared) source mount short, the pause leaves I/O for the
+    instrument that writes the source. Note that SQLite restarts a stepped backup if another
+    process writes to the source in between, so a very long pause can delay the sync.
+
+    :param src: Read-only connection to the source
+    :type src: sqlite3.Connection
+    :param dst: Connection to the destination
+    :type dst: sqlite3.Connection
+    :param src_path: Path of the source, for logging
+    :type src_path: str
+    :param pages: Pages per step, -1 copies the whole database in one step (default BackupPagesPerStep)
+    :type pages: int | None
+    :param sleep: Seconds to pause between two steps (default BackupSleepSeconds)
+    :type sleep: float | None
+    :return: Size, duration and throughput of the copy
+    :rtype: dict[str, float]
+    """
+    pages = BackupPagesPerStep if pages is None else pages
+    pause = BackupSleepSeconds if sleep is None else sleep
+    start = time.perf_counter()
+    steps = 0
+
+    def progress(status: int, remaining: int, total: int) -> None:
+        nonlocal steps
+        steps += 1
+        logger.debug(
+            "db_sync_progress",
+            extra={"src": src_path, "pages_done": total - remaining, "pages_total": total})
+        if remaining and pause > 0:
+            time.sleep(pause)
+
+    src.backup(dst, pages=pages, progress=progress)
+
+    duration = time.perf_counter() - start
+    page_size, page_count = (dst.execute(f"PRAGMA {pragma}").fetchone()[0] for pragma in ("page_size", "page_count"))
+    size_mb = page_size * page_count / 1_000_000
+    return {
+        "bytes": page_size * page_count,
+        "duration_ms": round(duration * 1000, 1),
+        "size_mb": round(size_mb, 2),
+        "mb_per_s": round(size_mb / duration, 1) if duration > 0 else 0.0,
+        "steps": steps,
+    }
+
+
+def _sync_pair(idx: int, src_path: str | Path, dst_path: str | Path, skip_unchanged: bool,
+               copied: list[str] | None, delta: bool) -> bool:
+    """
+    Sync one source/destination pair, see sync_database.
+
+    :param idx: Position of the pair, for logging
+    :type idx: int
+    :param src_path: Path to the source database
+    :type src_path: str | Path
+    :param dst_path: Path to the destination database
+    :type dst_path: str | Path
+    :param skip_unchanged: Skip the source if it did not change since its last successful sync
+    :type skip_unchanged: bool
+    :param copied: If given, the source path is appended to it when it was copied
+    :type copied: list[str] | None
+    :param delta: Copy only the rows the source gained since the last sync, if possible
+    :type delta: bool
+    :return: True if the pair was synced or skipped as unchanged, False otherwise
+    :rtype: bool
+    """
+    logger.debug(
+            "database_sync_pair_processing",
+            extra={"index": idx, "src_path": src_path, "dst_path": dst_path},
+        )
+
+    # Check if source database exists
+    if not os.path.exists(src_path):
+        logger.warning(
+                "database_source_not_found",
+                extra={"src_path": src_path},
+            )
+        return False
+
+    # Taken before the copy, so a change that lands during the copy is picked up by the next sync
+    try:
+        fingerprint: tuple[int, ...] | None = source_fingerprint(src_path)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("database_fingerprint_failed", extra={
+            "src_path": str(src_path), "error_class": type(e).__name__, "error": str(e)})
+        fingerprint = None
+
+    source = Path(src_path).name
+    if (skip_unchanged and fingerprint is not None and os.path.exists(dst_path)
+            and _source_fingerprints.get(str(src_path)) == fingerprint):
+        CACHE_REQUESTS.inc(cache="sync_fingerprint", result="hit")
+        logger.info("db_sync_skipped_unchanged", extra={"src": src_path, "dst": dst_path})
+        return True
+    if skip_unchanged:
+        CACHE_REQUESTS.inc(cache="sync_fingerprint", result="miss")
+
+    if delta and os.path.exists(dst_path):
+        start = time.perf_counter()
+        try:
+            rows_written = _delta_sync(str(src_path), str(dst_path))
+        except Exception as e:
+            logger.warning("db_delta_sync_failed", extra={
+                "src_path": str(src_path), "dst_path": str(dst_path),
+                "error_class": type(e).__name__, "error": str(e)}, exc_info=True)
+            rows_written = None
+
+        if rows_written is not None:
+            SYNC_SECONDS.observe(time.perf_counter() - start, source=source, mode="delta")
+            logger.info("db_delta_sync_done", extra={"src": src_path, "dst": dst_path, "rows_written": rows_written})
+            if fingerprint is not None:
+                _source_fingerprints[str(src_path)] = fingerprint
+            if copied is not None:
+                copied.append(str(src_path))
+            return True
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dst_path), prefix=TEMP_PREFIX, suffix=TEMP_SUFFIX)
+    os.close(fd)
+
+    try: 
+    # Open the source read-only (mode=ro), do not remove.
+    # A read-only handle makes it physically impossible for this sync to write to the
+    # external instrument database, so it can never be modified or corrupted here; only
+    # the temp copy is written, then swapped in atomically via os.replace below.
+    # (It also avoids taking a write lock on the source if the instrument is writing it.)
+        with closing(sqlite3.connect(f"file:{src_path}?mode=ro", uri=True)) as src, \
+        closing(sqlite3.connect(tmp_path)) as dst:
+            with src, dst:
+                metrics = _throttled_backup(src, dst, str(src_path))
+
+        os.replace(tmp_path, dst_path)
+        SYNC_BYTES.inc(metrics["bytes"], source=source)
+        SYNC_SECONDS.observe(metrics["duration_ms"] / 1000, source=source, mode="full")
+        SYNC_THROUGHPUT.set(metrics["mb_per_s"], source=source)
+        logger.info("db_sync_done", extra={"src": src_path, "dst": dst_path, **metrics})
+        if fingerprint is not None:
+            _source_fingerprints[str(src_path)] = fingerprint
+        if copied is not None:
+            copied.append(str(src_path))
+        return True
+
+    except Exception as e:
+        logger.error("database_sync_failed", extra={
+            "src_path": str(src_path), "dst_path": str(dst_path),
+            "error_class": type(e).__name__, "error": str(e)}, exc_info=True)
+        return False
+    
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def sync_database(source_db_path: str | Path | list[str] | None, dest_db_path: str | Path | list[str] | None,
+                  skip_unchanged: bool = False, copied: list[str] | None = None, delta: bool = False) -> bool:
     """
     Copy database(s) from source to destination.
 
     Supports both single database sync and multiple database syncs.
     When lists are provided, syncs pairs of databases (first to first, second to second, etc.).
+    Up to SyncWorkers pairs are copied at the same time; the result is True only if every pair succeeded.
+
+    With skip_unchanged=True a source whose fingerprint (see source_fingerprint) equals the one
+    recorded at its last successful sync, and whose destination still exists, is not copied again.
+    A skipped source counts as successful.
+
+    With delta=True an existing destination is updated in place with only the new rows
+    (see _delta_sync); a full backup is used when the destination does not exist yet or the
+    delta sync detects a schema change or a rewritten source.
 
     :param source_db_path: Path(s) to the source database file(s) - can be single path or list
     :type source_db_path: str | Path | list[str] | None
     :param dest_db_path: Path(s) to the destination database file(s) - can be single path or list
     :type dest_db_path: str | Path | list[str] | None
+    :param skip_unchanged: Skip sources that did not change since their last successful sync
+    :type skip_unchanged: bool
+    :param copied: If given, the source paths that were actually copied are appended to it
+    :type copied: list[str] | None
+    :param delta: Copy only the rows a source gained since the last sync, if possible
+    :type delta: bool
     :return: True if all syncs were successful, False otherwise
     :rtype: bool
     """
@@ -59,51 +418,59 @@ def sync_database(source_db_path: str | Path | list[str] | None, dest_db_path: s
                     "dest_count": len(dest_paths)})
         return False
     
-    all_successful = True
+    pairs = list(zip(source_paths, dest_paths))
+    workers = min(SyncWorkers, len(pairs))
 
-    for idx, (src_path, dst_path) in enumerate(zip(source_paths, dest_paths)):
-        logger.debug(
-                "database_sync_pair_processing",
-                extra={"index": idx, "src_path": src_path, "dst_path": dst_path},
-            )
+    def sync_pair(idx: int, pair: tuple[str | Path, str | Path]) -> bool:
+        with span(logger, "sync_source", src=str(pair[0])) as timing:
+            timing["synced"] = _sync_pair(idx, pair[0], pair[1], skip_unchanged, copied, delta)
+            return bool(timing["synced"])
 
-            # Check if source database exists
-        if not os.path.exists(src_path):
-            logger.warning(
-                    "database_source_not_found",
-                    extra={"src_path": src_path},
-                )
-            all_successful = False
-            continue
+    # Sources sit on different mounts, so their copies can overlap; every pair is attempted either way
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db-sync") as executor:
+            results = list(executor.map(propagate_correlation(sync_pair), range(len(pairs)), pairs))
+    else:
+        results = [sync_pair(idx, pair) for idx, pair in enumerate(pairs)]
+
+    return all(results)
 
-        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dst_path), prefix=TEMP_PREFIX, suffix=TEMP_SUFFIX)
-        os.close(fd)
-
-        try: 
-        # Open the source read-only (mode=ro), do not remove.
-        # A read-only handle makes it physically impossible for this sync to write to the
-        # external instrument database, so it can never be modified or corrupted here; only
-        # the temp copy is written, then swapped in atomically via os.replace below.
-        # (It also avoids taking a write lock on the source if the instrument is writing it.)
-            with closing(sqlite3.connect(f"file:{src_path}?mode=ro", uri=True)) as src, \
-            closing(sqlite3.connect(tmp_path)) as dst:
-                with src, dst:
-                    src.backup(dst)
-
-            os.replace(tmp_path, dst_path)
-            logger.info("db_sync_done", extra={"src": src_path, "dst": dst_path})
-                    
-        except Exception as e:
-            logger.error("database_sync_failed", extra={
-                "src_path": str(src_path), "dst_path": str(dst_path),
-                "error_class": type(e).__name__, "error": str(e)}, exc_info=True)
-            all_successful = False
-        
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)     
 
-    return all_successful 
+def sync_concurrently(syncs: dict[str, Callable[[], bool]]) -> dict[str, bool]:
+    """
+    Run independent sync_database calls at the same time and wait for all of them.
+
+    Used to sync the MQQC and metadata databases together, since each call may have its own options.
+
+    :param syncs: Sync calls keyed by a name, e.g. functools.partial(sync_database, src, dst)
+    :type syncs: dict[str, Callable[[], bool]]
+    :return: Result of each sync call, keyed by the same name
+    :rtype: dict[str, bool]
+    """
+    if len(syncs) < 2:
+        return {name: sync() for name, sync in syncs.items()}
+
+    with ThreadPoolExecutor(max_workers=len(syncs), thread_name_prefix="db-sync-group") as executor:
+        futures = {name: executor.submit(propagate_correlation(sync)) for name, sync in syncs.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def sync_external_sources(full: bool = False) -> dict[str, bool]:
+    """
+    Sync all external databases to their internal copies, MQQC and metadata at the same time.
+
+    A delta sync (DeltaSyncMQQC) only re-reads the newest rows of a source, so edits to older rows
+    are missed; full=True makes a full backup of every source, which is done at startup and before the
+    nightly rebuild.
+
+    :param full: Full backup of every source, also with DeltaSyncMQQC
+    :type full: bool
+    :return: Result of the MQQC ("mqqc") and the metadata ("meta") sync
+    :rtype: dict[str, bool]
+    """
+    return sync_concurrently({
+        "mqqc": partial(sync_database, external_mqqc, MQQC_DB, delta=DeltaSyncMQQC and not full),
+        "meta": partial(sync_database, external_meta, Metadata_DB)})
 
 
 def sweep_orphaned_temp_files(dest_paths: str | Path | list[str] | None) -> int:
@@ -1,27 +1,46 @@
+import logging
 import duckdb
 import os
 import json
+import time
 import datetime as dt
-from ProjectQCDashboard.config.configuration import PLOT_CONFIG, UpdateLastXEntries, DB_CONFIG
+from ProjectQCDashboard.config.configuration import PLOT_CONFIG, UpdateLastXEntries, DB_CONFIG, TablesMetaData, TablesMQQCData
 from ProjectQCDashboard.config.paths import MergedDuckDB
-from ProjectQCDashboard.config.logger import get_configured_logger
+from ProjectQCDashboard.config.logger import get_configured_logger, span
+from ProjectQCDashboard.config.metrics import DUCKDB_OPENS, MERGE_ROWS, MERGE_SECONDS
 from ProjectQCDashboard.db.database import bump_db_version
+from ProjectQCDashboard.db.profiling import profiled
+from ProjectQCDashboard.db.SyncDatabases import source_fingerprint
 from pathlib import Path
 
 logger = get_configured_logger(__name__)
 
 
+def _file_size(path: str) -> int:
+    """Size of a DuckDB database file plus its WAL, 0 for files that do not exist."""
+    return sum(os.path.getsize(p) for p in (path, f"{path}.wal") if os.path.exists(p))
+
+
 class DuckDBUpdater:
-    def __init__(self, mqqc_db_path: list[str], metadata_db_path: str) -> None:
+    def __init__(self, mqqc_db_path: list[str], metadata_db_path: str, staging: bool = False) -> None:
         """
         Handles updating and merging multiple MQQC and metadata databases into a single DuckDB database.
 
         Provides methods for full and incremental updates, merging logic, and schema alignment.
+
+        With staging=True the source tables are first copied into native DuckDB tables inside the
+        merged database (schemas mqqc0, mqqc1, ... and meta_all, so the merge query reads them under
+        the same names as the attached SQLite databases). Sources are only ever attached read-only,
+        so this is safe to point at the external instrument databases directly (DirectIngest).
+        On the internal copies (StageSources), the staging tables are refreshed after a sync changed
+        a copy, and the merges read columnar DuckDB tables instead of scanning SQLite pages each time.
         
         :param mqqc_db_path: The path(s) to the MQQC database(s) - can be a single path or list of paths
         :type mqqc_db_path: list[str]
         :param metadata_db_path: The path to the metadata database
         :type metadata_db_path: str 
+        :param staging: Merge from native DuckDB copies of the sources instead of attaching them
+        :type staging: bool
         """
         # Support both single path and list of paths
         if isinstance(mqqc_db_path, (str, Path)):
@@ -30,10 +49,14 @@ class DuckDBUpdater:
             self.mqqc_db_paths = [str(p) for p in mqqc_db_path]
         
         self.metadata_db_path = metadata_db_path
+        self.staging = staging
+
+        # Fingerprint of each source when it was last copied into its staging schema
+        self._staged_fingerprints: dict[str, tuple[int, ...]] = {}
 
         logger.info(
             "duckdb_updater_initialized",
-            extra={"mqqc_database_count": len(self.mqqc_db_paths)},
+            extra={"mqqc_database_count": len(self.mqqc_db_paths), "staging": staging},
         )
         
         self.SQL_mergedDB_template = """
@@ -57,7 +80,7 @@ class DuckDBUpdater:
                 SELECT
                     {mqqc_select},
                     {mqqc_iqc_select},
-                    meta_sample.* EXCLUDE (ProjectID),
+                    meta_sample.* EXCLUDE (ProjectID){meta_sample_replace},
                     COALESCE(REGEXP_REPLACE(meta_sample.SampleName_ID, '(\\.raw|\\.d)$', ''), mqqc_regular.Name, REGEXP_REPLACE(mqqc_iqc_cte.Name, '(\\.raw|\\.d)$', '')) AS RawFileName,
                    COALESCE(meta_sample.ProjectID, CONCAT_WS('_', list_extract(string_split(COALESCE(mqqc_regular.Name, REGEXP_REPLACE(mqqc_iqc_cte.Name, '(\\.raw|\\.d)$', '')), '_'), 1), list_extract(string_split(COALESCE(mqqc_regular.Name, REGEXP_REPLACE(mqqc_iqc_cte.Name, '(\\.raw|\\.d)$', '')), '_'), 2), list_extract(string_split(COALESCE(mqqc_regular.Name, REGEXP_REPLACE(mqqc_iqc_cte.Name, '(\\.raw|\\.d)$', '')), '_'), 3))) AS ProjectID,
                    CAST(COALESCE(CAST(meta_sample.CreationDate as timestamp),
@@ -112,7 +135,7 @@ class DuckDBUpdater:
         mtime_json = json.dumps(mtime_dict)
 
         con.execute(
-            "INSERT INTO meta_data VALUES (current_localtimestamp(), ?, ?)",
+            "INSERT INTO meta_data (updated_at, source_mtimes, row_count) VALUES (current_localtimestamp(), ?, ?)",
             [mtime_json, row_count]
         )
 
@@ -139,14 +162,18 @@ class DuckDBUpdater:
 
         return list_columns, all_columns
     
-    def _build_mqqc_union(self, con: duckdb.DuckDBPyConnection, config_columns: list[str]) -> tuple[str, str, str]:
+    def _build_mqqc_union(self, con: duckdb.DuckDBPyConnection, config_columns: list[str],
+                          metric_columns: set[str]) -> tuple[str, str, str]:
         """
         Build a UNION query that aligns columns across all MQQC databases.
 
         Ensures all required columns are present, filling with NULLs where missing.
+        Metric columns are cast to DOUBLE (values that are not numbers become NULL),
+        because MQQC stores them as TEXT.
 
         :param con: DuckDB connection with attached databases
         :param config_columns: List of columns to select
+        :param metric_columns: Columns that hold plotted metrics
         :return: Tuple of (union_query, mqqc_select, mqqc_iqc_select)
         :rtype: tuple[str, str, str]
         """
@@ -169,8 +196,12 @@ class DuckDBUpdater:
             # Build SELECT clause with NULLs for missing columns
             select_parts = []
             for col in needed_columns:
-                if col in db_columns:
+                if col in db_columns and col in metric_columns:
+                    select_parts.append(f'TRY_CAST("{col}" AS DOUBLE) AS "{col}"')
+                elif col in db_columns:
                     select_parts.append(f'"{col}"')
+                elif col in metric_columns:
+                    select_parts.append(f'CAST(NULL AS DOUBLE) AS "{col}"')
                 else:
                     select_parts.append(f'NULL AS "{col}"')
             
@@ -197,12 +228,259 @@ class DuckDBUpdater:
         )
         return union_query, mqqc_select, mqqc_iqc_select
 
+    def _staging_sources(self) -> list[tuple[str, str, list[str]]]:
+        """
+        List the sources with the schema they are staged in and the tables that are copied.
+
+        :return: List of (source path, schema name, table names)
+        :rtype: list[tuple[str, str, list[str]]]
+        """
+        sources = [(path, f"mqqc{idx}", TablesMQQCData) for idx, path in enumerate(self.mqqc_db_paths)]
+        sources.append((str(self.metadata_db_path), "meta_all", TablesMetaData))
+        return sources
+
+    def _fingerprint(self, path: str) -> tuple[int, ...] | None:
+        try:
+            return source_fingerprint(path)
+        except Exception as e:
+            logger.warning("staging_fingerprint_failed", extra={
+                "src_path": path, "error_class": type(e).__name__, "error": str(e)})
+            return None
+
+    def sources_changed(self) -> list[str]:
+        """
+        Return the sources that changed since they were last copied into their staging schema.
+
+        Without staging every source is returned, as the merge always reads the sources themselves.
+
+        :return: Paths of the changed sources
+        :rtype: list[str]
+        """
+        if not self.staging:
+            return [path for path, _, _ in self._staging_sources()]
+
+        changed = []
+        for path, _, _ in self._staging_sources():
+            fingerprint = self._fingerprint(path)
+            if fingerprint is None or self._staged_fingerprints.get(path) != fingerprint:
+                changed.append(path)
+        return changed
+
+    def refresh_staging(self, con: duckdb.DuckDBPyConnection, only_changed: bool = True,
+                        full: bool = False) -> list[str]:
+        """
+        Copy the source tables into native DuckDB tables in the merged database.
+
+        The rows are kept in {schema}_raw with the SQLite rowid in an extra _rowid column; {schema}
+        holds views without that column, which the merge reads. A changed source only gets the rows
+        past a watermark appended (see _append_staging); all its tables are copied in full if that is
+        not possible or `full` is set. Each source is attached read-only under a temporary name and
+        its tables are updated in one transaction, so the merge never sees half of a source refreshed.
+        Sources whose fingerprint did not change since their last copy are skipped if only_changed is set.
+
+        :param con: DuckDB connection to the merged database, with sqlite_scanner loaded
+        :type con: duckdb.DuckDBPyConnection
+        :param only_changed: Skip sources that did not change since their last copy
+        :type only_changed: bool
+        :param full: Copy every table in full instead of appending new rows
+        :type full: bool
+        :return: Paths of the sources that were copied
+        :rtype: list[str]
+        """
+        refreshed = []
+        for path, schema, tables in self._staging_sources():
+            # Taken before the copy, so a change that lands during the copy is picked up next time
+            fingerprint = self._fingerprint(path)
+            if (only_changed and fingerprint is not None and self._staged_fingerprints.get(path) == fingerprint
+                    and self._staging_exists(con, schema)):
+                continue
+
+            start = time.perf_counter()
+            # The paths are operator-configured and validated in validate_databases.
+            con.execute(f"ATTACH '{path}' AS src_{schema} (TYPE SQLITE, READ_ONLY)")
+            try:
+                con.execute("BEGIN TRANSACTION")
+                try:
+                    rows_written = None if full else self._append_staging(con, schema, tables)
+                    mode = "append"
+                    if rows_written is None:
+                        rows_written = self._copy_staging(con, schema, tables)
+                        mode = "full"
+                    con.execute("COMMIT")
+                except Exception:
+                    con.execute("ROLLBACK")
+                    raise
+            finally:
+                con.execute(f"DETACH src_{schema}")
+
+            if fingerprint is not None:
+                self._staged_fingerprints[path] = fingerprint
+            refreshed.append(path)
+            logger.info("staging_refreshed", extra={
+                "src_path": path, "schema": schema, "mode": mode, "rows_written": rows_written,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 1)})
+
+        return refreshed
+
+    def _copy_staging(self, con: duckdb.DuckDBPyConnection, schema: str, tables: list[str]) -> int:
+        """
+        Replace the staging tables of one source with full copies of the attached source tables.
+
+        :param con: DuckDB connection with the source attached as src_{schema}
+        :type con: duckdb.DuckDBPyConnection
+        :param schema: Staging schema of the source
+        :type schema: str
+        :param tables: Tables to copy
+        :type tables: list[str]
+        :return: Number of rows copied
+        :rtype: int
+        """
+        # Also removes plain tables staged before the _raw schema existed
+        con.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        con.execute(f"DROP SCHEMA IF EXISTS {schema}_raw CASCADE")
+        con.execute(f"CREATE SCHEMA {schema}")
+        con.execute(f"CREATE SCHEMA {schema}_raw")
+        rows_copied = 0
+        for table in tables:
+            con.execute(f'CREATE TABLE {schema}_raw."{table}" AS SELECT rowid AS _rowid, * FROM src_{schema}."{table}"')
+            con.execute(f'CREATE VIEW {schema}."{table}" AS SELECT * EXCLUDE (_rowid) FROM {schema}_raw."{table}"')
+            result = con.execute(f'SELECT COUNT(*) FROM {schema}_raw."{table}"').fetchone()
+            rows_copied += int(result[0]) if result else 0
+        return rows_copied
+
+    def _source_rows(self, schema: str, table: str, columns: list[tuple[str, str]], where: str) -> str:
+        """
+        Build a query for the rows of an attached source table that match `where`, typed like its staging table.
+
+        sqlite_query runs the statement in SQLite itself, so a rowid condition uses the rowid instead of
+        scanning the whole table like a filter on the attached table does. It returns every value as text,
+        so REAL values are printed with 17 significant digits (exact round trip; SQLite needs the
+        '!' flag for more than 16) and cast back.
+
+        :param schema: Staging schema of the source, attached as src_{schema}
+        :type schema: str
+        :param table: Source table
+        :type table: str
+        :param columns: (name, DuckDB type) of the source columns
+        :type columns: list[tuple[str, str]]
+        :param where: Condition in SQLite syntax
+        :type where: str
+        :return: DuckDB query with the _rowid column first
+        :rtype: str
+        """
+        def quote(name: str) -> str:
+            return '"' + name.replace('"', '""') + '"'
+
+        sqlite_columns = ", ".join(
+            f"CASE WHEN typeof({quote(name)}) = 'real' THEN printf('%!.17g', {quote(name)}) ELSE {quote(name)} END AS {quote(name)}"
+            for name, _ in columns)
+        sqlite_sql = f"SELECT rowid AS _rowid, {sqlite_columns} FROM {quote(table)} WHERE {where}"
+        casts = ", ".join(f"CAST({quote(name)} AS {col_type}) AS {quote(name)}" for name, col_type in columns)
+        return (f"SELECT CAST(_rowid AS BIGINT) AS _rowid, {casts} "
+                f"FROM sqlite_query('src_{schema}', '{sqlite_sql.replace(chr(39), chr(39) * 2)}')")
+
+    def _append_staging(self, con: duckdb.DuckDBPyConnection, schema: str, tables: list[str],
+                        tail_rows: int = UpdateLastXEntries) -> int | None:
+        """
+        Bring the staging tables of one source up to date by copying only the rows the source gained.
+
+        Same watermark as the delta sync of the internal copies (see SyncDatabases._delta_sync): per table,
+        the last ``tail_rows`` staged rows and everything after them are replaced by the source rows with
+        the same rowids, so appended rows and edits to recent rows both arrive. Edits to older rows arrive
+        with the next full copy (nightly rebuild).
+
+        Returns None, without changing anything, when a full copy is needed instead: nothing is staged
+        yet, the columns differ, or the source was rewritten (rows removed or the first row or the row at
+        the watermark differ between source and staging table).
+
+        :param con: DuckDB connection with the source attached as src_{schema}
+        :type con: duckdb.DuckDBPyConnection
+        :param schema: Staging schema of the source
+        :type schema: str
+        :param tables: Tables to update
+        :type tables: list[str]
+        :param tail_rows: Number of trailing rows per table that are copied again
+        :type tail_rows: int
+        :return: Number of rows written, or None if a full copy is needed
+        :rtype: int | None
+        """
+        if not self._staging_exists(con, f"{schema}_raw"):
+            return None
+
+        rows_written = 0
+        for table in tables:
+            raw = f'{schema}_raw."{table}"'
+            columns = [(row[0], row[1]) for row in con.execute(f'DESCRIBE src_{schema}."{table}"').fetchall()]
+            try:
+                staged = [(row[0], row[1]) for row in con.execute(f"DESCRIBE {raw}").fetchall()]
+            except duckdb.CatalogException:
+                staged = []
+            if staged != [("_rowid", "BIGINT"), *columns]:
+                logger.info("staging_append_fallback", extra={"schema": schema, "table": table, "reason": "schema_changed"})
+                return None
+
+            src_max_row = con.execute(
+                f"SELECT MAX(CAST(m AS BIGINT)) FROM sqlite_query('src_{schema}', 'SELECT MAX(rowid) AS m FROM \"{table}\"')"
+            ).fetchone()
+            src_max = src_max_row[0] if src_max_row else None
+            dst_min, dst_max = con.execute(f"SELECT MIN(_rowid), MAX(_rowid) FROM {raw}").fetchone() or (None, None)
+
+            if dst_max is not None:
+                # rowid of the last row that is kept as is; None if the whole table is copied again
+                tail = con.execute(f"SELECT _rowid FROM {raw} ORDER BY _rowid DESC LIMIT 1 OFFSET ?", [tail_rows]).fetchone()
+                watermark = tail[0] if tail else None
+                checks = [dst_min] + ([watermark] if watermark is not None else [])
+                # One row per query: an equality filter can skip row groups by their min/max, an IN list cannot
+                rewritten = src_max is None or src_max < dst_max or any(
+                    con.execute(f"SELECT * FROM {raw} WHERE _rowid = ?", [rowid]).fetchone()
+                    != con.execute(self._source_rows(schema, table, columns, f"rowid = {int(rowid)}")).fetchone()
+                    for rowid in checks)
+                if rewritten:
+                    logger.info("staging_append_fallback", extra={"schema": schema, "table": table, "reason": "rewritten"})
+                    return None
+            else:
+                watermark = None
+
+            if watermark is None:
+                con.execute(f"DELETE FROM {raw}")
+                where = "1"
+            else:
+                con.execute(f"DELETE FROM {raw} WHERE _rowid > ?", [watermark])
+                where = f"rowid > {int(watermark)}"
+            result = con.execute(f"INSERT INTO {raw} {self._source_rows(schema, table, columns, where)}").fetchone()
+            rows_written += int(result[0]) if result else 0
+
+        return rows_written
+
+    def _staging_exists(self, con: duckdb.DuckDBPyConnection, schema: str) -> bool:
+        result = con.execute(
+            "SELECT COUNT(*) FROM duckdb_schemas() WHERE database_name = current_database() AND schema_name = ?",
+            [schema]).fetchone()
+        return bool(result and result[0])
+
+    def _prepare_sources(self, con: duckdb.DuckDBPyConnection, full: bool = False) -> None:
+        """
+        Make the sources readable as mqqc0, mqqc1, ... and meta_all. Used before _build_merge_query.
+
+        :param con: DuckDB connection to the merged database
+        :param full: With staging, copy all source tables in full instead of appending new rows
+        """
+        with span(logger, "prepare_sources", staging=self.staging):
+            if self.staging:
+                self.refresh_staging(con, only_changed=not full, full=full)
+            else:
+                self._attach_sources(con)
+
     def _attach_sources(self, con: duckdb.DuckDBPyConnection) -> None:   
         """
         Attach source databases. Used before _build_merge_query.
 
         :param con: DuckDB connection
         """
+        # Staging schemas left from a DirectIngest run would make mqqc0/meta_all ambiguous
+        for _, schema, _ in self._staging_sources():
+            con.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+            con.execute(f"DROP SCHEMA IF EXISTS {schema}_raw CASCADE")
         
         for idx, mqqc_path in enumerate(self.mqqc_db_paths):
             
@@ -225,8 +503,17 @@ class DuckDBUpdater:
         :rtype: str
         """
         
-        config_columns = DB_CONFIG + [config[0] for config in PLOT_CONFIG.values()]
-        mqqc_union, mqqc_select, mqqc_iqc_select = self._build_mqqc_union(con, config_columns)
+        metric_columns = {config[0] for config in PLOT_CONFIG.values()}
+        config_columns = DB_CONFIG + list(metric_columns)
+        mqqc_union, mqqc_select, mqqc_iqc_select = self._build_mqqc_union(con, config_columns, metric_columns)
+
+        # Metric columns of the metadata (e.g. pump pressures) are stored as DOUBLE as well
+        meta_sample_columns = [row[0] for row in con.execute("DESCRIBE meta_all.Metadata_Sample").fetchall()]
+        meta_metrics = [col for col in meta_sample_columns if col in metric_columns and col != "ProjectID"]
+        meta_sample_replace = (
+            " REPLACE (" + ", ".join(f'TRY_CAST(meta_sample."{col}" AS DOUBLE) AS "{col}"' for col in meta_metrics) + ")"
+            if meta_metrics else ""
+        )
         
         logger.debug(
             "merge_query_debug_info",
@@ -239,7 +526,8 @@ class DuckDBUpdater:
         return self.SQL_mergedDB_template.format(
             mqqc_union=mqqc_union,
             mqqc_select=mqqc_select,
-            mqqc_iqc_select=mqqc_iqc_select
+            mqqc_iqc_select=mqqc_iqc_select,
+            meta_sample_replace=meta_sample_replace,
         )
 
     def update_db(self, num_recent_rows: int = UpdateLastXEntries, force_full_refresh: bool = False) -> None:
@@ -268,7 +556,54 @@ class DuckDBUpdater:
 
         bump_db_version()
 
-    
+    def run_maintenance(self, mode: str) -> dict[str, float | str]:
+        """
+        Compact the merged database, optionally after a full rebuild, and record it in meta_data.
+
+        A rebuild replaces project_data, which drops the deleted and updated row versions the
+        incremental MERGEs accumulate; the CHECKPOINT afterwards writes the database and returns
+        the free blocks at the end of the file. Duration and file size before and after are stored
+        in the maintenance column of the meta_data row the rebuild recorded, or of a new row that
+        repeats the latest one (checkpoint). Rows with a maintenance entry are not data updates and
+        are left out of the data freshness shown on the dashboard.
+
+        :param mode: "checkpoint" to compact only, "rebuild" for a full refresh before compacting
+        :type mode: str
+        :return: Mode, duration and file sizes of the run
+        :rtype: dict[str, float | str]
+        """
+        logger.info("maintenance_started", extra={"mode": mode})
+        start = time.perf_counter()
+        size_before = _file_size(MergedDuckDB)
+
+        if mode == "rebuild":
+            self.update_db(force_full_refresh=True)
+
+        DUCKDB_OPENS.inc(purpose="write")
+        with duckdb.connect(MergedDuckDB) as con:
+            con.execute("CHECKPOINT")
+            size_after = _file_size(MergedDuckDB)
+            result: dict[str, float | str] = {
+                "mode": mode,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+                "bytes_before": size_before,
+                "bytes_after": size_after,
+                "bytes_reclaimed": size_before - size_after,
+            }
+            # Databases created before the maintenance column existed
+            con.execute("ALTER TABLE meta_data ADD COLUMN IF NOT EXISTS maintenance JSON")
+            if mode == "rebuild":
+                # The row the rebuild recorded belongs to the maintenance, it brought no new data
+                con.execute("""UPDATE meta_data SET maintenance = ?
+                               WHERE updated_at = (SELECT MAX(updated_at) FROM meta_data)""", [json.dumps(result)])
+            else:
+                con.execute("""INSERT INTO meta_data (updated_at, source_mtimes, row_count, maintenance)
+                               SELECT current_localtimestamp(), source_mtimes, row_count, ?
+                               FROM meta_data ORDER BY updated_at DESC LIMIT 1""", [json.dumps(result)])
+
+        logger.info("maintenance_complete", extra=result)
+        return result
+
     def _incremental_update(self, num_recent_rows: int = UpdateLastXEntries) -> None:
         """
         Perform incremental update using most recent rows from metadata.
@@ -278,9 +613,10 @@ class DuckDBUpdater:
         :param num_recent_rows: Number of most recent rows to process
         :type num_recent_rows: int
         """
+        DUCKDB_OPENS.inc(purpose="write")
         with duckdb.connect(MergedDuckDB) as con:
             con.execute("LOAD sqlite_scanner")
-            self._attach_sources(con)
+            self._prepare_sources(con)
             sql_query = self._build_merge_query(con)
 
                       
@@ -314,10 +650,12 @@ class DuckDBUpdater:
                         """).fetchdf()
             
             recent_samples = recent_samples_df['sample_id'].tolist()
-            logger.debug(
-                    "recent_samples_identified",
-                    extra={"recent_samples": recent_samples},
-                )
+            if logger.isEnabledFor(logging.DEBUG):
+                # Up to 2 x UpdateLastXEntries names: only copied and serialized when debugging
+                logger.debug(
+                        "recent_samples_identified",
+                        extra={"recent_samples": recent_samples},
+                    )
             
             if not recent_samples:
                 logger.info("no_recent_samples_to_update")
@@ -350,9 +688,14 @@ class DuckDBUpdater:
                         """  
             
             try:
-                con.execute(query, [recent_samples])
-                total_rows = self._count_rows(con)
-                self._record_update(con, total_rows) 
+                with span(logger, "merge_incremental", samples=len(recent_samples)) as timing:
+                    with profiled(con, "merge_incremental"):
+                        merged = con.execute(query, [recent_samples]).fetchone()
+                    timing["rows_changed"] = merged[0] if merged else 0
+                    total_rows = self._count_rows(con)
+                    self._record_update(con, total_rows) 
+                MERGE_ROWS.inc(timing["rows_changed"], mode="incremental")
+                MERGE_SECONDS.observe(timing["duration_ms"] / 1000, mode="incremental")
 
             except Exception as e:
                 logger.error("incremental_update_failed",
@@ -381,26 +724,37 @@ class DuckDBUpdater:
                 extra={"merged_db": MergedDuckDB},
             )
             
+            DUCKDB_OPENS.inc(purpose="write")
             with duckdb.connect(MergedDuckDB) as con:
                 logger.info("sqlite_scanner_loading")
                 con.execute("LOAD sqlite_scanner")
                 
-                self._attach_sources(con)
+                # A full refresh also re-copies the staging tables, which picks up edits to old source rows
+                self._prepare_sources(con, full=True)
                 sql_query = self._build_merge_query(con)
         
                 logger.info("duckdb_create_table_started")
-                con.execute(f"CREATE OR REPLACE TABLE project_data AS {sql_query} ")
+                with span(logger, "merge_full") as timing:
+                    with profiled(con, "merge_full"):
+                        con.execute(f"CREATE OR REPLACE TABLE project_data AS {sql_query} ")
+                    timing["rows"] = self._count_rows(con)
+                MERGE_ROWS.inc(timing["rows"], mode="full")
+                MERGE_SECONDS.observe(timing["duration_ms"] / 1000, mode="full")
                 logger.info("duckdb_table_created")
                 # WHERE 1=0 -> if I want it to be empty
                 con.execute("CREATE INDEX IF NOT EXISTS idx_project ON project_data(ProjectID)")
                 con.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_rawfile ON project_data(RawFileName)")
                 logger.info("duckdb_index_created")
                 
-                con.execute(f"""CREATE OR REPLACE TABLE meta_data (
+                # Kept across rebuilds: it holds the update and maintenance history
+                con.execute("""CREATE TABLE IF NOT EXISTS meta_data (
                                 updated_at TIMESTAMP,
                                 source_mtimes JSON,
-                                row_count INTEGER
+                                row_count INTEGER,
+                                maintenance JSON
                             )""")
+                # Databases created before the maintenance column existed
+                con.execute("ALTER TABLE meta_data ADD COLUMN IF NOT EXISTS maintenance JSON")
                 
                 total_rows_initial = self._count_rows(con)
                 self._record_update(con, total_rows_initial)   
@@ -1,5 +1,7 @@
 import os
 import sqlite3
+import datetime as dt
+import duckdb
 from pathlib import Path
 from ProjectQCDashboard.config.configuration import TablesMetaData, TablesMQQCData
 from ProjectQCDashboard.config.logger import get_configured_logger
@@ -118,3 +120,36 @@ def validate_databases(external_mqqc_dbs: list[str] | None = None,
     
     
     logger.info("external_databases_validated")
+
+
+def merged_db_is_recent(merged_db: str, max_age_hours: float) -> bool:
+    """
+    Check whether the merged DuckDB database can be served as it is at startup (warm start).
+
+    It must exist, contain rows in project_data, and have a meta_data row younger than max_age_hours.
+
+    :param merged_db: Path to the merged DuckDB database
+    :type merged_db: str
+    :param max_age_hours: Maximum age of the last update in hours, 0 disables the warm start
+    :type max_age_hours: float
+    :return: True if the database is valid and recent
+    :rtype: bool
+    """
+    if max_age_hours <= 0 or not os.path.isfile(merged_db):
+        return False
+    try:
+        with duckdb.connect(merged_db) as con:
+            rows = con.execute("SELECT COUNT(*) FROM project_data").fetchone()
+            updated = con.execute("SELECT MAX(updated_at) FROM meta_data").fetchone()
+    except duckdb.Error as e:
+        logger.warning("merged_db_not_usable", extra={"merged_db": merged_db,
+                                                      "error_class": type(e).__name__, "error": str(e)})
+        return False
+
+    if not rows or not rows[0] or not updated or updated[0] is None:
+        return False
+    # meta_data stores current_localtimestamp()
+    age_hours = (dt.datetime.now() - updated[0]).total_seconds() / 3600
+    logger.info("merged_db_age_checked", extra={"merged_db": merged_db, "age_hours": round(age_hours, 2),
+                                                 "max_age_hours": max_age_hours})
+    return age_hours <= max_age_hours
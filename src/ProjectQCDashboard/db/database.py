@@ -1,11 +1,21 @@
 from ProjectQCDashboard.config.logger import get_configured_logger
 from ProjectQCDashboard.config.paths import  MergedDuckDB
+from pathlib import Path
+import fcntl
+import json
+import os
+import shutil
 import threading
+import time
 import duckdb
+from ProjectQCDashboard.config.metrics import DUCKDB_OPENS, CACHE_REQUESTS, DB_VERSION, LAST_UPDATE
+from ProjectQCDashboard.config.configuration import SnapshotMinIntervalSeconds
 
 logger = get_configured_logger(__name__)
 
 _state_lock = threading.Lock()
+# Notified on every version bump, wakes up long-polling clients (see wait_for_db_version)
+_version_changed = threading.Condition(_state_lock)
 
 # cache of the version of cache and project IDs
 _cache: tuple[int, list[str]] = (0, [])
@@ -13,17 +23,241 @@ _cache: tuple[int, list[str]] = (0, [])
 # cached version of the database 
 _db_version = 0
 
+# Multi-worker serving: one process (the writer) owns the observer, the queue and all writes to the
+# merged DB and publishes read-only snapshots of the new versions. All other workers (readers)
+# serve the snapshot named in the version file. "single" is the default one-process mode.
+_role = "single"
+_writer_lock_fd: int | None = None
+_snapshot_path = ""
+_version_file_mtime: int | None = None
+SNAPSHOTS_KEPT = 2
+# A snapshot is a full copy of the merged DB, so bumps within SnapshotMinIntervalSeconds share one
+# (see publish_snapshot_if_due); monotonic time of the last attempt
+_last_publish = float("-inf")
+_published_version = 0
+
+
+def _writer_lock_file() -> str:
+    return f"{MergedDuckDB}.writer.lock"
+
+
+def _version_file() -> str:
+    return f"{MergedDuckDB}.version"
+
+
+def get_role() -> str:
+    """Return the serving role of this process: "single", "writer" or "reader"."""
+    with _state_lock:
+        return _role
+
+
+def _snapshot_version(path: Path) -> int:
+    return int(path.name.rsplit(".v", 1)[1])
+
+
+def _snapshots() -> list[Path]:
+    return list(Path(MergedDuckDB).parent.glob(f"{Path(MergedDuckDB).name}.v*[0-9]"))
+
+
+def _latest_published_version() -> int:
+    """Highest version published by an earlier writer: from the version file or the snapshots on disk."""
+    versions = [_snapshot_version(path) for path in _snapshots()]
+    try:
+        versions.append(int(json.loads(Path(_version_file()).read_text())["version"]))
+    except (OSError, ValueError, KeyError):
+        pass
+    return max(versions, default=0)
+
+
+def acquire_writer_role() -> bool:
+    """
+    Elect this process as the single writer by taking an exclusive lock on the writer lock file.
+
+    The lock is held until the process exits, so when the writer dies, the next worker Gunicorn
+    starts takes it over. Processes that do not get the lock become readers. A new writer continues
+    the version numbering of the previous one, so readers never see the version go back.
+
+    :return: True if this process is the writer
+    :rtype: bool
+    """
+    global _role, _writer_lock_fd, _db_version, _published_version
+    lock_file = _writer_lock_file()
+    fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        with _state_lock:
+            _role = "reader"
+        logger.info("writer_role_taken_by_other_worker", extra={"pid": os.getpid(), "lock_file": lock_file})
+        return False
+
+    os.ftruncate(fd, 0)
+    os.write(fd, str(os.getpid()).encode())
+    previous_version = _latest_published_version()
+    with _state_lock:
+        _role = "writer"
+        _writer_lock_fd = fd
+        _db_version = max(_db_version, previous_version)
+        _published_version = max(_published_version, previous_version)
+    logger.info("writer_role_acquired",
+                extra={"pid": os.getpid(), "lock_file": lock_file, "previous_version": previous_version})
+    return True
+
+
+def _publish_snapshot(version: int) -> bool:
+    """
+    Copy the merged DB to a versioned snapshot and point the version file at it.
+
+    DuckDB does not let other processes read a file that is open for writing, so readers never
+    open the merged DB itself. Older snapshots are removed (oldest first, never the new one);
+    readers that still have one open keep reading it until they close the connection.
+
+    :param version: The new DB version
+    :type version: int
+    :return: True if the snapshot was published
+    :rtype: bool
+    """
+    snapshot = f"{MergedDuckDB}.v{version}"
+    tmp = f"{snapshot}.tmp"
+    start = time.perf_counter()
+    try:
+        DUCKDB_OPENS.inc(purpose="snapshot")
+        with duckdb.connect(MergedDuckDB) as con:
+            con.execute("CHECKPOINT")  # the snapshot must not depend on the WAL
+        shutil.copyfile(MergedDuckDB, tmp)
+        os.replace(tmp, snapshot)
+
+        version_tmp = f"{_version_file()}.tmp"
+        Path(version_tmp).write_text(json.dumps({"version": version, "path": snapshot}))
+        os.replace(version_tmp, _version_file())
+    except (OSError, duckdb.Error) as e:
+        logger.error(
+            "snapshot_publish_failed",
+            extra={"version": version, "error_class": type(e).__name__, "error": str(e)}, exc_info=True)
+        return False
+
+    old = sorted((path for path in _snapshots() if str(path) != snapshot),
+                 key=lambda p: (p.stat().st_mtime_ns, _snapshot_version(p)))
+    for path in old[:max(len(old) - (SNAPSHOTS_KEPT - 1), 0)]:
+        path.unlink(missing_ok=True)
+    logger.info("snapshot_published", extra={
+        "version": version, "snapshot": snapshot, "size_bytes": os.path.getsize(snapshot),
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1)})
+    return True
+
+
+def publish_snapshot_if_due(force: bool = False) -> bool:
+    """
+    Writer only: publish a snapshot of the current version if it is not published yet.
+
+    Must be called from the thread that writes the merged DB (the queue thread, or the startup
+    and catch-up code before it), between two merges: the CHECKPOINT and the copy need the file
+    without an open merge transaction, and nothing else may write it while it is copied.
+    Snapshots are full copies, so one is made at most every SnapshotMinIntervalSeconds and covers
+    all bumps since the last one. A failed publish keeps the version pending and is retried after
+    the same interval.
+
+    :param force: Publish regardless of SnapshotMinIntervalSeconds, e.g. after the startup build
+    :type force: bool
+    :return: True if a snapshot was published
+    :rtype: bool
+    """
+    global _last_publish, _published_version
+    now = time.monotonic()
+    with _state_lock:
+        if _role != "writer" or _db_version <= _published_version:
+            return False
+        if not force and now - _last_publish < SnapshotMinIntervalSeconds:
+            return False
+        version = _db_version
+        _last_publish = now
+
+    if not _publish_snapshot(version):
+        return False
+    with _state_lock:
+        _published_version = max(_published_version, version)
+    return True
+
+
+def _refresh_from_version_file() -> None:
+    """Reader side: adopt the version and snapshot from the version file if it changed."""
+    global _db_version, _snapshot_path, _version_file_mtime
+    try:
+        mtime = os.stat(_version_file()).st_mtime_ns
+        with _state_lock:
+            if mtime == _version_file_mtime:
+                return
+        data = json.loads(Path(_version_file()).read_text())
+    except (OSError, ValueError):
+        return  # not published yet, retried on the next call
+
+    with _state_lock:
+        _version_file_mtime = mtime
+        _db_version = int(data["version"])
+        _snapshot_path = str(data["path"])
+
 
 def bump_db_version() -> int:
     global _db_version
     with _state_lock:
         _db_version += 1
-        return _db_version
+        version = _db_version
+        _version_changed.notify_all()
+    DB_VERSION.set(version)
+    LAST_UPDATE.set(time.time())
+    # A writer publishes the new version with the next publish_snapshot_if_due on the queue thread
+    return version
 
 def get_db_version() -> int:
     """Needed to get the _db_version threadsafe outside of the database module"""
+    if get_role() == "reader":
+        _refresh_from_version_file()
     with _state_lock:
         return _db_version
+
+
+def wait_for_db_version(since: int, timeout: float) -> int:
+    """
+    Block until the DB version differs from `since` or the timeout passes (long-poll).
+
+    Bumps in this process wake the waiters immediately; a reader worker re-checks the
+    version file every second.
+
+    :param since: Version the client has already seen
+    :type since: int
+    :param timeout: Maximum time to wait in seconds
+    :type timeout: float
+    :return: The current DB version (equal to `since` on timeout)
+    :rtype: int
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        version = get_db_version()
+        remaining = deadline - time.monotonic()
+        if version != since or remaining <= 0:
+            return version
+        with _version_changed:
+            if _db_version == since:
+                _version_changed.wait(min(remaining, 1.0))
+
+
+def connect_merged() -> duckdb.DuckDBPyConnection:
+    """
+    Open a connection for reading the merged DB: the merged DB itself, or the latest snapshot
+    (read-only) in a reader worker.
+
+    :return: DuckDB connection
+    :rtype: duckdb.DuckDBPyConnection
+    """
+    DUCKDB_OPENS.inc(purpose="read")
+    with _state_lock:
+        if _role != "reader":
+            return duckdb.connect(MergedDuckDB)
+        path = _snapshot_path
+    if not path:
+        raise FileNotFoundError("No snapshot of the merged DB has been published yet")
+    return duckdb.connect(path, read_only=True)
     
     
 
@@ -38,13 +272,15 @@ def get_all_project_ids() -> list[str]:
     """
     global _cache
     
+    version = get_db_version()
     with _state_lock:
-        version = _db_version
         if _cache and _cache[0] == version and version != 0:
+            CACHE_REQUESTS.inc(cache="project_ids", result="hit")
             return _cache[1]
+    CACHE_REQUESTS.inc(cache="project_ids", result="miss")
 
     try:
-        with duckdb.connect(MergedDuckDB) as con:
+        with connect_merged() as con:
             df = con.execute(
                 """SELECT DISTINCT ProjectID FROM project_data
                 ORDER BY DateTime DESC"""
@@ -0,0 +1,102 @@
+import json
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator
+import duckdb
+from ProjectQCDashboard.config.logger import get_configured_logger
+from ProjectQCDashboard.config.paths import log_filepath
+from ProjectQCDashboard.config.configuration import ProfileMerges, ProfilesKept
+
+logger = get_configured_logger(__name__)
+
+PROFILE_DIR = Path(log_filepath).parent / "merge_profiles"
+SLOWEST_OPERATORS = 10
+
+
+def _operators(node: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Yield every operator of a DuckDB JSON profile, depth first."""
+    for child in node.get("children", []):
+        yield child
+        yield from _operators(child)
+
+
+def summarize_profile(profile: dict[str, Any], top: int = SLOWEST_OPERATORS) -> dict[str, Any]:
+    """
+    Summarize a DuckDB JSON profile: total latency and the slowest operators.
+
+    :param profile: Parsed JSON written by DuckDB with enable_profiling='json'
+    :type profile: dict[str, Any]
+    :param top: Number of operators to keep
+    :type top: int
+    :return: Latency, rows returned and the `top` operators sorted by their own time
+    :rtype: dict[str, Any]
+    """
+    operators = sorted(_operators(profile), key=lambda op: op.get("operator_timing", 0), reverse=True)
+    return {
+        "latency_s": profile.get("latency"),
+        "cpu_time_s": profile.get("cpu_time"),
+        "rows_returned": profile.get("rows_returned"),
+        "slowest_operators": [{
+            "operator": op.get("operator_name"),
+            "timing_s": round(op.get("operator_timing", 0), 6),
+            "rows": op.get("operator_cardinality"),
+            "table": op.get("extra_info", {}).get("Table"),
+        } for op in operators[:top]],
+    }
+
+
+def _prune_profiles(profile_dir: Path, keep: int) -> None:
+    """Delete all but the newest `keep` profiles (and their summaries)."""
+    profiles = sorted(profile_dir.glob("*.profile.json"), key=lambda p: p.stat().st_mtime)
+    for old in profiles[:-keep] if keep > 0 else profiles:
+        old.unlink(missing_ok=True)
+        old.with_name(old.name.replace(".profile.json", ".summary.json")).unlink(missing_ok=True)
+
+
+@contextmanager
+def profiled(con: duckdb.DuckDBPyConnection, kind: str, enabled: bool | None = None,
+             profile_dir: Path | None = None, keep: int | None = None) -> Iterator[None]:
+    """
+    Profile the DuckDB statement(s) run inside the block and save the profile of the last one.
+
+    DuckDB rewrites the profile after every statement, so the block should contain only the merge.
+    Next to `<kind>_<timestamp>.profile.json` a `.summary.json` with the slowest operators is written
+    and logged; only the newest ProfilesKept profiles are kept. Failures only log a warning.
+
+    :param con: Connection that runs the merge
+    :type con: duckdb.DuckDBPyConnection
+    :param kind: Name of the profiled statement, e.g. "merge_full"
+    :type kind: str
+    :param enabled: Profile at all (default ProfileMerges)
+    :type enabled: bool | None
+    :param profile_dir: Where to save the profiles (default logs/merge_profiles)
+    :type profile_dir: Path | None
+    :param keep: Number of profiles to keep (default ProfilesKept)
+    :type keep: int | None
+    """
+    if not (ProfileMerges if enabled is None else enabled):
+        yield
+        return
+
+    profile_dir = PROFILE_DIR if profile_dir is None else profile_dir
+    keep = ProfilesKept if keep is None else keep
+    name = f"{kind}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+    profile_path = profile_dir / f"{name}.profile.json"
+
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    con.execute("SET enable_profiling = 'json'")
+    con.execute(f"SET profiling_output = '{profile_path.as_posix()}'")
+    try:
+        yield
+    finally:
+        con.execute("PRAGMA disable_profiling")
+
+    try:
+        summary = summarize_profile(json.loads(profile_path.read_text()))
+        profile_path.with_name(f"{name}.summary.json").write_text(json.dumps(summary, indent=2))
+        _prune_profiles(profile_dir, keep)
+        logger.info("merge_profile_saved", extra={"profile": str(profile_path), **summary})
+    except (OSError, ValueError) as e:
+        logger.warning("merge_profile_failed", extra={"profile": str(profile_path),
+                                                      "error_class": type(e).__name__, "error": str(e)})
@@ -5,13 +5,15 @@ import threading
 from pathlib import Path
 from ProjectQCDashboard.db.UpdateDB import DuckDBUpdater
 from ProjectQCDashboard.ui.AppLayout import AppLayout
-from ProjectQCDashboard.db.SyncDatabases import sync_database, sweep_orphaned_temp_files
-from ProjectQCDashboard.db.ValidateDatabases import validate_databases
+from ProjectQCDashboard.db.SyncDatabases import sync_external_sources, sweep_orphaned_temp_files
+from ProjectQCDashboard.db.database import bump_db_version, acquire_writer_role, publish_snapshot_if_due
+from ProjectQCDashboard.db.ValidateDatabases import validate_databases, merged_db_is_recent
 from ProjectQCDashboard.background.observer import Observer_DBs
 from ProjectQCDashboard.config.RunningContainer import _is_running_in_container
-from ProjectQCDashboard.config.paths import  external_mqqc, external_meta, Metadata_DB, MQQC_DB
+from ProjectQCDashboard.config.paths import  external_mqqc, external_meta, Metadata_DB, MQQC_DB, MergedDuckDB
+from ProjectQCDashboard.config.configuration import DirectIngest, StageSources, WarmStartMaxAgeHours, MultiWorkerServing
 from ProjectQCDashboard.config.logger import get_configured_logger
-from ProjectQCDashboard.background.processQ import process_queue
+from ProjectQCDashboard.background.processQ import process_queue, catch_up
 
 logger = get_configured_logger(__name__)
 
@@ -25,10 +27,13 @@ def create_app() -> Dash:
     2. Verifies database files exist
     3. Syncs external databases to internal copies
     4. Creates/updates the merged DuckDB database
+       (with a warm start, 3 and 4 run in the background and the existing merged DB is served meanwhile)
     5. Sets up file system observers for database changes
     6. Initializes background threads for monitoring database changes
     7. Creates and returns the Dash application instance
 
+    With MultiWorkerServing, only the worker elected as writer runs steps 2-6, the others just serve.
+
     :return: Configured Dash application instance
     :rtype: Dash
     :raises RuntimeError: If not running in a container or initialization fails
@@ -48,16 +53,34 @@ def create_app() -> Dash:
 
     
     app_layout_instance = AppLayout()
+
+    if MultiWorkerServing and not acquire_writer_role():
+        # Reader worker: serves the snapshots the writer publishes, no sync, merge or observer
+        app = app_layout_instance.createapp()
+        logger.info("dashboard_started", extra={"role": "reader"})
+        return app
+
+    # Warm start: serve the existing merged DB right away and bring it up to date in the background
+    warm_start = merged_db_is_recent(MergedDuckDB, WarmStartMaxAgeHours)
        
     if not external_mqqc:
         # Local dev mode without observer — validate internal DBs directly
         validate_databases(MQQC_DB, Metadata_DB)
+    elif DirectIngest:
+        # The external DBs are read (read-only) straight into DuckDB, no internal copies
+        validate_databases(external_mqqc, external_meta)
     else:
         # Container mode or local dev with observer configured
         validate_databases(external_mqqc, external_meta) # checks whether the DBs exist in the container or in other folder for local mode
         sweep_orphaned_temp_files([*MQQC_DB, Metadata_DB])
-        synced_mqqc = sync_database(external_mqqc, MQQC_DB) # sync the external DBs to the internal ones
-        synced_meta = sync_database(external_meta, Metadata_DB)
+
+    if warm_start:
+        # The sync and the rebuild run in the background, see processQ.catch_up
+        logger.info("warm_start_serving_existing_db", extra={"merged_db": MergedDuckDB})
+    elif external_mqqc and not DirectIngest:
+        # sync the external DBs to the internal ones, MQQC and metadata at the same time (full backup)
+        synced = sync_external_sources(full=True)
+        synced_mqqc, synced_meta = synced["mqqc"], synced["meta"]
 
         if not synced_mqqc or not synced_meta:
             logger.error("database_synchronization failed", 
@@ -68,9 +91,16 @@ def create_app() -> Dash:
     
     logger.info("database_initialization_started")
     try:
-        DuckDB = DuckDBUpdater(MQQC_DB, Metadata_DB)
-        DuckDB.update_db(force_full_refresh=True)
-        logger.info("database_updated")
+        if DirectIngest and external_mqqc:
+            DuckDB = DuckDBUpdater(external_mqqc, external_meta, staging=True)
+        else:
+            DuckDB = DuckDBUpdater(MQQC_DB, Metadata_DB, staging=StageSources)
+        if warm_start:
+            bump_db_version()  # the existing DB is the first served version, so its queries are cached
+        else:
+            DuckDB.update_db(force_full_refresh=True)
+            logger.info("database_updated")
+        publish_snapshot_if_due(force=True)  # only in the multi-worker writer; before the queue thread starts
     except Exception as e:
         logger.error(
             "database_initialization_failed",
@@ -106,12 +136,15 @@ def create_app() -> Dash:
 
         # For production (Gunicorn), queue processing runs in background thread
         sync_external = True
-        queue_thread = threading.Thread(target=process_queue, args=(q, stop_event,sync_external,))
+        queue_thread = threading.Thread(target=process_queue, args=(q, stop_event,sync_external, DuckDB, warm_start,))
         queue_thread.daemon = True
         queue_thread.start()
 
     else:
         logger.info("no_external_dbs_defined_observer_not_started") 
+        if warm_start:
+            catch_up_thread = threading.Thread(target=catch_up, args=(DuckDB, False,), daemon=True)
+            catch_up_thread.start()
 
     app = app_layout_instance.createapp()
     logger.info("dashboard_started")       
@@ -1,12 +1,16 @@
+import logging
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from dash import Dash, dcc, html, Input, Output, State, dash, ctx
+import time
+from flask import Response, g, jsonify, request
 from dash.exceptions import PreventUpdate
 from ProjectQCDashboard.ui.processDataForFig import get_all_data, get_data_freshness
-from ProjectQCDashboard.db.database import get_all_project_ids, search_project_ids, get_db_version
-from ProjectQCDashboard.config.logger import get_configured_logger
-from ProjectQCDashboard.config.configuration import PLOT_CONFIG
+from ProjectQCDashboard.db.database import get_all_project_ids, search_project_ids, get_db_version, wait_for_db_version
+from ProjectQCDashboard.config.logger import get_configured_logger, correlation_id
+from ProjectQCDashboard.config.metrics import CALLBACK_SECONDS, render_metrics
+from ProjectQCDashboard.config.configuration import PLOT_CONFIG, LongPollSeconds
 from ProjectQCDashboard.ui.AppLayoutComponents import (
     FigureComponents,
     create_full_html,
@@ -15,6 +19,7 @@ from ProjectQCDashboard.ui.AppLayoutComponents import (
 )
 from ProjectQCDashboard.config.configuration import ThresholdForTwoColumnsOfGraphs
 from typing import Any
+import uuid
 from pathlib import Path
 import dash_bootstrap_components as dbc
 import plotly.io as pio
@@ -42,6 +47,48 @@ class AppLayout:
             external_stylesheets=external_style,
             assets_folder=str(assets_folder),
         )
+        self._instrument_callbacks()
+
+    def _instrument_callbacks(self) -> None:
+        """
+        Time every Dash callback request, give it a correlation ID and serve /metrics.
+
+        The span covers the callback, the figure building and the JSON serialization of the response.
+        Everything logged while handling the request carries the same correlation_id.
+        """
+        server = self.app.server
+        callback_path = f"{self.app.config.routes_pathname_prefix}_dash-update-component"
+
+        @server.before_request
+        def start_request() -> None:
+            if request.path == callback_path:
+                g.correlation_token = correlation_id.set(f"req-{uuid.uuid4().hex[:12]}")
+                g.request_start = time.perf_counter()
+
+        @server.after_request
+        def finish_request(response: Response) -> Response:
+            start = g.pop("request_start", None)
+            if start is not None:
+                payload = request.get_json(silent=True) or {}
+                callback = str(payload.get("output", ""))[:200]
+                duration = time.perf_counter() - start
+                CALLBACK_SECONDS.observe(duration, callback=callback)
+                logger.info("span_finished", extra={
+                    "span": "callback", "callback": callback,
+                    "status_code": response.status_code, "response_bytes": response.content_length,
+                    "duration_ms": round(duration * 1000, 1)})
+            return response
+
+        @server.route("/metrics")
+        def metrics() -> Response:
+            """Prometheus text format metrics of this worker, for a local scraper (not behind the URL prefix)."""
+            return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+        @server.teardown_request
+        def reset_correlation(_exc: BaseException | None) -> None:
+            token = g.pop("correlation_token", None)
+            if token is not None:
+                correlation_id.reset(token)
        
     def _build_graphs_container(self) -> html.Div:
         """
@@ -77,7 +124,11 @@ class AppLayout:
         - Data export (CSV, HTML)
         - Dynamic updates when the database changes
 
-        Database updates are recognizes via the _db_version that is stored in db-version-store-dropdown & db-version-store-figures. 
+        Database updates are recognized via the _db_version. The browser learns about new versions by
+        long-polling api/db-version (assets/version_push.js), which writes them to db-version-push.
+        A clientside callback copies a version that differs from the one the page was built with (or
+        last updated to) to db-version-store, the one input the update callbacks react to, so a
+        version check never costs a server round trip.
 
         :return: The configured Dash application instance
         :rtype: Dash
@@ -86,7 +137,6 @@ class AppLayout:
         # Load project IDs only when creating the app layout
       
         logger.info("app_layout_creation_started")
-        initial_ids = get_all_project_ids()
         
         # Warm up Plotly/px to avoid a large one-time initialization cost on
         # the first call to px.scatter/CreateFig. This typically reduces the
@@ -111,12 +161,21 @@ class AppLayout:
 
         ##########################
 
-        # Main container using Bootstrap grid. Each graph is wrapped in a card for nicer styling.
-        self.app.layout = dbc.Container([
+        def serve_layout() -> dbc.Container:
+            """
+            Build the page for one page load. db-version-store holds the DB version the page was built
+            with, so versions published after that are recognized as changes (see assets/version_push.js).
+            """
+            # Read before the project IDs and the initial callbacks, so the data shown is at least this new
+            rendered_version = get_db_version()
+            initial_ids = get_all_project_ids()
+
+            # Main container using Bootstrap grid. Each graph is wrapped in a card for nicer styling.
+            return dbc.Container([
                     
-                    dcc.Store(id='db-version-store-dropdown', data=0),
-                    dcc.Store(id='db-version-store-figures', data=0),
-                    dcc.Interval(id='interval-update-projectids', interval=1*60*1000, n_intervals=0), # every  min
+                    dcc.Store(id='db-version-store', data=rendered_version),
+                    dcc.Store(id='rendered-plots-store', data={}),
+                    dcc.Store(id='db-version-push', data=0),  # set by assets/version_push.js when the DB changes
                     # Header area (title) with a dark background spanning full width
                     create_page_header(),
 
@@ -160,11 +219,29 @@ class AppLayout:
                     ]), width=6)),
                     create_page_footer(),
                 ], fluid=True)
+
+        # A function, so every page load gets the current project list and DB version
+        self.app.layout = serve_layout
         
 
         #####################
         ### here the callbacks and other update functions start
         #####################
+
+        @self.app.server.route(f"{self.app.config.routes_pathname_prefix}api/db-version")
+        def serve_db_version() -> Response:
+            """
+            Long-poll endpoint for DB changes: returns the current version right away without `since`,
+            otherwise as soon as it differs from `since` or after LongPollSeconds.
+            """
+            since = request.args.get("since", type=int)
+            if since is None:
+                version = get_db_version()
+            else:
+                version = wait_for_db_version(since, LongPollSeconds)
+            response = jsonify(version=version)
+            response.headers["Cache-Control"] = "no-store"
+            return response
       
         # Generate callback outputs dynamically from PLOT_CONFIG
         graph_outputs = [Output(component_id=graph_id, component_property='figure') 
@@ -175,47 +252,59 @@ class AppLayout:
                             for key in get_plot_keys()]
         
         
+        # Version probe: the only thing a pushed version triggers. Runs in the browser and passes
+        # the version on only if it differs from the one the page shows.
+        self.app.clientside_callback(
+            """
+            function(pushed, seen) {
+                if (pushed === null || pushed === undefined || pushed === seen) {
+                    return window.dash_clientside.no_update;
+                }
+                return pushed;
+            }
+            """,
+            Output('db-version-store', 'data'),
+            Input('db-version-push', 'data'),
+            State('db-version-store', 'data'),
+            prevent_initial_call=True,
+        )
+
         @self.app.callback(
-            [Output('ProjectIDs', 'options'), Output('ProjectIDs', 'value'), Output('db-version-store-dropdown', 'data') ],
-            [Input('ProjectIDs', 'search_value'), Input('interval-update-projectids', 'n_intervals')],
-            [State('ProjectIDs', 'value'), State('db-version-store-dropdown', 'data')]
+            [Output('ProjectIDs', 'options'), Output('ProjectIDs', 'value')],
+            [Input('ProjectIDs', 'search_value'), Input('db-version-store', 'data')],
+            [State('ProjectIDs', 'value')]
         )
     
-        def update_project_ids(search_value: str, n_intervals: Any, current_value: str, last_seen_version: Any) -> tuple[list[dict[str, str]], str | None, int]:
+        def update_project_ids(search_value: str, db_version: Any, current_value: str) -> tuple[list[dict[str, str]], str | None]:
             """
             Callback to update the project ID dropdown options and value based on search or database change.
 
-            Triggered by user search or periodic interval. Updates the dropdown list of project IDs if there is a new version or upon search
-            and ensures the selected value remains valid. Also updates the stored DB version.
+            Triggered by user search or a new DB version. Updates the dropdown list of project IDs
+            and ensures the selected value remains valid.
 
             :param search_value: The current search string entered by the user
             :type search_value: str
-            :param n_intervals: Number of intervals elapsed (triggers periodic refresh)
-            :type n_intervals: Any
+            :param db_version: DB version shown by the page (triggers refresh on DB change)
+            :type db_version: Any
             :param current_value: The currently selected project ID
             :type current_value: str
-            :param last_seen_version: Last seen database version
-            :type last_seen_version: Any
-            :return: Tuple of (dropdown options, selected value, current DB version)
-            :rtype: tuple[list[dict[str, str]], str | None, int]
+            :return: Tuple of (dropdown options, selected value)
+            :rtype: tuple[list[dict[str, str]], str | None]
             """
-            # gets ID which triggered the update: when the database changed the 'db-version-store-dropdown' is updated and triggers the update of the list
+            # gets ID which triggered the update: when the database changed the 'db-version-store' is updated and triggers the update of the list
             # when something is searched, this triggers an update of the dropdown list
             triggered = ctx.triggered_id
-            current_version = get_db_version()
-
-            if triggered == 'interval-update-projectids' and last_seen_version == current_version:
-                raise PreventUpdate
             
-            logger.debug(
-                "update_project_ids_triggered",
-                extra={
-                    "triggered_by": triggered,
-                    "search_value_type": type(search_value).__name__ if search_value is not None else None,
-                    "search_value": str(search_value)[:100] if search_value is not None else None,
-                    "current_value": str(current_value)[:30] if current_value is not None else None,
-                },
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "update_project_ids_triggered",
+                    extra={
+                        "triggered_by": triggered,
+                        "search_value_type": type(search_value).__name__ if search_value is not None else None,
+                        "search_value": str(search_value)[:100] if search_value is not None else None,
+                        "current_value": str(current_value)[:30] if current_value is not None else None,
+                    },
+                )
 
             pattern = search_value if (triggered == 'ProjectIDs' and isinstance(search_value, str)) else None
             project_ids = search_project_ids(pattern, limit=100)
@@ -223,7 +312,7 @@ class AppLayout:
             if current_value and current_value not in project_ids:
                 options.append({"label": current_value, "value": current_value})
 
-            return options, current_value or (project_ids[0] if project_ids else None), current_version
+            return options, current_value or (project_ids[0] if project_ids else None)
 
         
         @self.app.callback(
@@ -234,55 +323,98 @@ class AppLayout:
             Output('table-style', 'style'),
             Output(component_id='graphs-container', component_property='className'),
             *col_class_outputs,
-            Output('db-version-store-figures', 'data'),
-            Input('ProjectIDs', 'value'), Input('interval-update-projectids', 'n_intervals'),
-            State('db-version-store-figures', 'data')
+            Output('rendered-plots-store', 'data'),
+            Input('ProjectIDs', 'value'), Input('plot-select', 'value'), Input('db-version-store', 'data'),
+            State('rendered-plots-store', 'data')
         )
         
-        def update_output_div(ProjectChosen: str, n_intervals: Any, last_seen_version: Any ) -> tuple[Any, ...]:
+        def update_output_div(ProjectChosen: str, selected_plots: list[str], db_version: Any, rendered_plots: Any) -> tuple[Any, ...]:
             """
-            Update all output figures, tables, and layout styles when a project is selected or the database changes.
+            Update the selected output figures, tables, and layout styles when a project is selected,
+            the plot selection changes or the database changes.
 
             Handles:
-            - Generating all figures for the selected project
+            - Generating only the figures selected in the plot-select checklist
+            - Lazily generating figures that are switched on again, without touching the rest
             - Updating error and project tables
             - Adjusting column visibility and layout based on data
             - Hiding/showing tables if no data is present
 
+            When only the selection changes, figures that are not selected are left untouched
+            (dash.no_update); when the project or the DB version changes they are replaced by empty
+            figures, so no stale figure of another project is kept. Which plots were built for which
+            project and DB version is kept in rendered-plots-store, so re-enabled plots are only
+            computed when they are stale.
+
             :param ProjectChosen: The selected project ID
             :type ProjectChosen: str
-            :param n_intervals: Number of intervals elapsed (triggers periodic refresh)
-            :type n_intervals: Any
-            :param last_seen_version: Last seen database version
-            :type last_seen_version: Any
-            :return: Tuple containing updated figures, tables, styles, column classes, and current DB version
+            :param selected_plots: List of plot keys currently selected
+            :type selected_plots: list[str]
+            :param db_version: DB version shown by the page (triggers refresh on DB change)
+            :type db_version: Any
+            :param rendered_plots: Project, DB version and plot keys of the figures currently rendered
+            :type rendered_plots: Any
+            :return: Tuple containing updated figures, tables, styles, column classes and rendered plots
             :rtype: tuple
             """
             triggered = ctx.triggered_id
             current_version = get_db_version()
 
-            if triggered == 'interval-update-projectids' and last_seen_version == current_version:
-                raise PreventUpdate
+            plot_keys = get_plot_keys()
+            selected = [key for key in plot_keys if key in (selected_plots or [])]
+            rendered_plots = rendered_plots or {}
+            rendered_store = {"project": ProjectChosen, "version": current_version, "keys": selected}
 
-            if ProjectChosen is None:
-                logger.debug("update_output_div_skipped_missing_project")
+            def empty_outputs() -> tuple[Any, ...]:
                 empty_fig = go.Figure()
                 col_classes = ["col-empty"] * len(PLOT_CONFIG)
-                return tuple([empty_fig] * len(PLOT_CONFIG) + [empty_fig, {'display': 'none'}, empty_fig, {'display': 'none'}, ""] + col_classes + [current_version])
+                return tuple([empty_fig] * len(PLOT_CONFIG) + [empty_fig, {'display': 'none'}, empty_fig, {'display': 'none'}, ""] + col_classes
+                             + [{**rendered_store, "keys": []}])
+
+            if ProjectChosen is None:
+                logger.debug("update_output_div_skipped_missing_project")
+                return empty_outputs()
+
+            up_to_date = (rendered_plots.get("project") == ProjectChosen
+                          and rendered_plots.get("version") == current_version)
+
+            if triggered == 'plot-select' and up_to_date:
+                # Only the plot selection changed: fill in plots that were switched on and are not built yet
+                already_rendered = rendered_plots.get("keys", [])
+                keys_to_render = [key for key in selected if key not in already_rendered]
+                if not keys_to_render:
+                    raise PreventUpdate
+
+                logger.debug("lazy_figure_render", extra={"project_id": ProjectChosen, "plot_keys": keys_to_render})
+                try:
+                    new_figs, _ = FigureComponents(ProjectChosen).generate_all_figures(keys_to_render)
+                except Exception as e:
+                    logger.error("figure_generation_failed", extra={"error_class": type(e).__name__,
+                                                                    "error": str(e)}, exc_info=True)
+                    raise PreventUpdate
+                if new_figs is None:
+                    raise PreventUpdate
+
+                figs_by_key = dict(zip(keys_to_render, new_figs))
+                figs: list[Any] = [figs_by_key.get(key, dash.no_update) for key in plot_keys]
+                col_classes: list[Any] = [dash.no_update if key not in figs_by_key
+                               else "col-empty" if figs_by_key[key].layout.uirevision == "no-data" else ""
+                               for key in plot_keys]
+                rendered_store["keys"] = list(already_rendered) + keys_to_render
+
+                return tuple(figs + [dash.no_update] * 5 + col_classes + [rendered_store])
         
             logger.info("project_selected", extra={"project_id": ProjectChosen})
             Output_components = FigureComponents(ProjectChosen)
             
             try:
-                # Generate all figures in PLOT_CONFIG order
+                # Generate the selected figures in PLOT_CONFIG order
                 # Returns None if no data exists for this project
-                all_figs, row_count = Output_components.generate_all_figures()
+                selected_figs, row_count = Output_components.generate_all_figures(selected)
                 
-                if all_figs is None:
+                if selected_figs is None:
                     logger.warning("project_not_in_db", extra={"project_id": ProjectChosen})
-                    empty_fig = go.Figure()
-                    col_classes = ["col-empty"] * len(PLOT_CONFIG)
-                    return tuple([empty_fig] * len(PLOT_CONFIG) + [empty_fig, {'display': 'none'}, empty_fig, {'display': 'none'}, ""] + col_classes + [current_version])
+                    return empty_outputs()
 
                 # Generate error table
                 error_table = Output_components.generate_table_error()
@@ -292,12 +424,21 @@ class AppLayout:
                 single_column = row_count >= ThresholdForTwoColumnsOfGraphs
                 class_name = "single-column" if single_column else ""
 
-                # Check which figures are empty and hide those columns
+                # Check which figures are empty and hide those columns; unselected plots are cleared,
+                # they still show an older project or DB version and are rebuilt when switched on again
+                figs_by_key = dict(zip(selected, selected_figs))
+                all_figs: list[Any] = []
                 col_classes = []
-                for fig in all_figs:
-                    if fig.layout.uirevision == "no-data":
+                for key in plot_keys:
+                    fig = figs_by_key.get(key)
+                    if fig is None:
+                        all_figs.append(go.Figure())
+                        col_classes.append(dash.no_update)
+                    elif fig.layout.uirevision == "no-data":
+                        all_figs.append(fig)
                         col_classes.append("col-empty")
                     else:
+                        all_figs.append(fig)
                         col_classes.append("")
 
                 # Return all figures plus tables in correct order
@@ -313,28 +454,20 @@ class AppLayout:
                     project_table = go.Figure()
                     project_table_style = {'display': 'none'}
                 
-                return tuple(list(all_figs) + [error_table, error_table_style, project_table, project_table_style, class_name] + col_classes + [current_version])
+                return tuple(all_figs + [error_table, error_table_style, project_table, project_table_style, class_name] + col_classes
+                             + [rendered_store])
                 
             except Exception as e:
                 logger.error("figure_generation_failed", extra={"error_class": type(e).__name__,
                                                                 "error": str(e)}, exc_info=True)
-                empty_fig = go.Figure()
-                col_classes = ["col-empty"] * len(PLOT_CONFIG)
-                return tuple([empty_fig] * len(PLOT_CONFIG) + [empty_fig, {'display': 'none'}, empty_fig, {'display': 'none'}, ""] + col_classes + [current_version])
+                return empty_outputs()
 
         @self.app.callback(
             Output('data-refreshed', 'children'),
-            Input('ProjectIDs', 'value'), Input('interval-update-projectids', 'n_intervals'),
-            State('db-version-store-figures', 'data')
+            Input('ProjectIDs', 'value'), Input('db-version-store', 'data'),
         )
         
-        def update_data_refreshed(id: Any, n_intervals: Any, last_seen_version: Any) -> str:
-            
-            triggered = ctx.triggered_id
-            current_version = get_db_version()
-
-            if triggered == 'interval-update-projectids' and last_seen_version == current_version:
-                raise PreventUpdate
+        def update_data_refreshed(id: Any, db_version: Any) -> str:
         
             updated_at, new_rows = get_data_freshness()
             if not updated_at:
@@ -1,11 +1,15 @@
 from collections import OrderedDict
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import plotly.graph_objects as go
 from dash import html
 from datetime import datetime
 import dash_bootstrap_components as dbc
 from ProjectQCDashboard.ui.Figures import Create_Figures
-from ProjectQCDashboard.config.logger import get_configured_logger
-from ProjectQCDashboard.config.configuration import PLOT_CONFIG, ThresholdForRollingMean, ROWS_Table  
+from ProjectQCDashboard.config.logger import get_configured_logger, propagate_correlation
+from ProjectQCDashboard.config.configuration import PLOT_CONFIG, ThresholdForRollingMean, ROWS_Table, FigureWorkers
 from datetime import datetime
 logger = get_configured_logger(__name__)
 
@@ -43,6 +47,25 @@ def get_plot_graph_ids() -> list[str]:
     return [value[2] for value in PLOT_CONFIG.values()]
 
 
+# One bounded pool shared by all callbacks, so concurrent requests cannot multiply the thread count
+_figure_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_figure_executor() -> ThreadPoolExecutor:
+    """
+    Return the shared thread pool used to build figures in parallel, creating it on first use.
+
+    :return: Thread pool with FigureWorkers threads
+    :rtype: ThreadPoolExecutor
+    """
+    global _figure_executor
+    with _executor_lock:
+        if _figure_executor is None:
+            _figure_executor = ThreadPoolExecutor(max_workers=FigureWorkers, thread_name_prefix="figures")
+        return _figure_executor
+
+
 def generateOptions() -> list[dict[str, str]]:
     """
     Generate a list of option dictionaries for Dash Checklist/Dropdown components.
@@ -68,40 +91,88 @@ class FigureComponents:
         :type ProjectChosen: str
         """
         self.ProjectChosen = ProjectChosen
+        self._gen: Create_Figures | None = None
 
-    def generate_all_figures(self) -> tuple[tuple[go.Figure, ...] | None, int]:
+    def _generator(self) -> Create_Figures:
+        """
+        Return the figure generator for this project, loading the project data on first use.
+
+        Figures and tables of one FigureComponents instance share this single query result.
+
+        :return: Figure generator holding the project data
+        :rtype: Create_Figures
+        """
+        if self._gen is None:
+            self._gen = Create_Figures(self.ProjectChosen)
+        return self._gen
+
+    def generate_all_figures(self, keys: list[str] | None = None) -> tuple[tuple[go.Figure, ...] | None, int]:
         """
         Create figures for all default plots and return them as an ordered tuple.
 
         The order matches DEFAULT_PLOTS.keys(). If `keys` is provided, only those keys
         will be included (but ordering is preserved relative to DEFAULT_PLOTS).
 
+        :param keys: plot keys to build; all plots if None
+        :type keys: list[str] | None
         :return: tuple of (plotly Figure objects tuple or None if no data, row count)
         :rtype: tuple[tuple[go.Figure, ...] | None, int]
         """
         # Get row count from first instance
-        gen = Create_Figures(self.ProjectChosen)
+        gen = self._generator()
         row_count = gen.nrows_valid_data
         
         if row_count == 0:
             return None, 0
         
-        figs = []
-        for key, y_label in DEFAULT_PLOTS.items():
- 
-            try:             
-                fig = gen.generate_fig(y_label)              
-                figs.append(fig)
-            except Exception as e:
-                logger.error(
-                    "figure_creation_failed",
-                    extra={"figure_key": key, 
-                           "error_class": type(e).__name__, "error": str(e)}, exc_info=True)
-                fig = go.Figure()
-                figs.append(fig)
+        plots = [(key, y_label) for key, y_label in DEFAULT_PLOTS.items() if keys is None or key in keys]
+        start = time.perf_counter()
+
+        if FigureWorkers > 1 and len(plots) > 1:
+            # Each task gets a shallow copy: the project data is shared read-only,
+            # the per-figure state that generate_fig sets on the instance is not.
+            executor = _get_figure_executor()
+            futures = [executor.submit(propagate_correlation(self._build_figure), copy.copy(gen), key, y_label)
+                       for key, y_label in plots]
+            figs = [future.result() for future in futures]
+        else:
+            figs = [self._build_figure(gen, key, y_label) for key, y_label in plots]
+
+        logger.info(
+            "figures_generated",
+            extra={"project_id": self.ProjectChosen, "figure_count": len(figs), "workers": FigureWorkers,
+                   "duration_ms": round((time.perf_counter() - start) * 1000, 1)})
 
         return tuple(figs), row_count 
 
+    def _build_figure(self, gen: Create_Figures, key: str, y_label: str) -> go.Figure:
+        """
+        Build a single figure and log how long it took. Returns an empty figure if building fails.
+
+        :param gen: Figure generator holding the project data
+        :type gen: Create_Figures
+        :param key: Plot key from PLOT_CONFIG
+        :type key: str
+        :param y_label: Column name to plot on the y-axis
+        :type y_label: str
+        :return: The figure for this plot
+        :rtype: go.Figure
+        """
+        start = time.perf_counter()
+        try:
+            fig = gen.generate_fig(y_label)
+        except Exception as e:
+            logger.error(
+                "figure_creation_failed",
+                extra={"figure_key": key, 
+                       "error_class": type(e).__name__, "error": str(e)}, exc_info=True)
+            fig = go.Figure()
+
+        logger.debug(
+            "figure_built",
+            extra={"figure_key": key, "duration_ms": round((time.perf_counter() - start) * 1000, 1)})
+        return fig
+
 
     def generate_all_figures_labels(self, selected_plots: list[str]) -> list[tuple[str, go.Figure]]:
         """
@@ -112,7 +183,7 @@ class FigureComponents:
         :return: list of (label, figure) tuples
         :rtype: list[tuple[str, go.Figure]]
         """
-        gen = Create_Figures(self.ProjectChosen)
+        gen = self._generator()
         out: list[tuple[str, go.Figure]] = []
 
         for key, y_label in DEFAULT_PLOTS.items():
@@ -140,7 +211,7 @@ class FigureComponents:
         :return: Table figure or None if no errors
         :rtype: go.Figure | None
         """
-        gen = Create_Figures(self.ProjectChosen)
+        gen = self._generator()
         ErrorTable = gen.create_table_error()
     
         return ErrorTable
@@ -152,7 +223,7 @@ class FigureComponents:
         :return: Table figure or None if no errors
         :rtype: go.Figure | None
         """
-        gen = Create_Figures(self.ProjectChosen)
+        gen = self._generator()
         ProjectTable = gen.create_table_project_data(ROWS_Table)
     
         return ProjectTable
@@ -1,14 +1,40 @@
+import logging
 import pandas as pd
 from pathlib import Path
 import numpy as np
 from typing import Any
-from ProjectQCDashboard.config.logger import get_configured_logger
+from ProjectQCDashboard.config.logger import get_configured_logger, span
 from ProjectQCDashboard.ui.processDataForFig import get_project_data
 import plotly.graph_objects as go
 from ProjectQCDashboard.config.configuration import ThresholdForRollingMean
 
 logger = get_configured_logger(__name__)
 
+
+def _typed_array(values: pd.Series) -> np.ndarray | pd.Series:
+    """
+    Convert a column to a float64 numpy array so plotly serializes it as a base64 typed array.
+
+    Plotly only emits the binary ``bdata`` encoding for numeric numpy arrays; datetime columns
+    would otherwise be written as one ISO string per point. Datetimes are therefore converted
+    to milliseconds since epoch, which plotly.js reads as dates on an axis of type ``date``.
+    Columns that are neither numeric nor datetime are returned unchanged.
+
+    :param values: The column to convert
+    :type values: pd.Series
+    :return: float64 array with NaN for missing values, or the original column
+    :rtype: np.ndarray | pd.Series
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        stamps = values.to_numpy(dtype="datetime64[ms]")
+        ms = stamps.astype("int64").astype("float64")
+        ms[np.isnat(stamps)] = np.nan
+        return ms
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype="float64", na_value=np.nan)
+    return values
+
+
 class DataframeForFig:
     """
     Handles filtering and processing of project data for figure generation.
@@ -34,12 +60,14 @@ class DataframeForFig:
         :rtype: tuple[pd.DataFrame, pd.DataFrame, float, float, float]
         """
     
-        df_Filtered = self.valid_data.copy()
-        df_Filtered = df_Filtered.dropna(subset=[y_Label])
-        df_Filtered[y_Label] = pd.to_numeric(df_Filtered[y_Label], errors='coerce')
-        df_Filtered = df_Filtered.loc[df_Filtered[y_Label].notnull(),:]
-        df_Filtered_all = df_Filtered.copy()
-        df_Filtered = df_Filtered[(df_Filtered["FileType"] != "HSstd") & (df_Filtered["FileType"] != "OtherStandard")]
+        with span(logger, "filter_df", level=logging.DEBUG, column=y_Label) as timing:
+            # Only copy the columns a figure needs; valid_data is shared read-only between figures
+            df_Filtered = self.valid_data.reindex(columns=["DateTime", "FileType", "RawFileName", y_Label])
+            # Metrics arrive as float64 from get_project_data, no numeric coercion needed here
+            df_Filtered = df_Filtered.dropna(subset=[y_Label])
+            df_Filtered_all = df_Filtered.copy()
+            df_Filtered = df_Filtered[(df_Filtered["FileType"] != "HSstd") & (df_Filtered["FileType"] != "OtherStandard")]
+            timing["rows"] = df_Filtered.shape[0]
         
         if df_Filtered.shape[0] >= ThresholdForRollingMean: # 30 as cutoff for rolling average
             df_Filtered, mean, median, std = self._rolling_mean_df(df_Filtered, y_Label, width = 15)
@@ -115,8 +143,7 @@ class DataframeForFig:
         :rtype: tuple[pd.DataFrame, float, float, float]
         """
    
-        # Coerce to numeric where possible; preserve NaN when coercion fails
-        numeric_series = pd.to_numeric(df_Filtered[y_Label], errors='coerce')
+        numeric_series = df_Filtered[y_Label]
         non_na_count = numeric_series.notna().sum()
         # If we have no numeric data, skip numeric ops and set safe defaults
         if non_na_count == 0:
@@ -265,19 +292,11 @@ class Create_Figures:
         for Column in ROWS_Table:
             is_instrument_method = Column in ("InstrumentMethod_print", "InstrumentMethod", "Method")
             column_key = "InstrumentMethod" if is_instrument_method else Column
-            unique_entries = set(self.valid_data[Column])
-
-            # Single unique value
-            if len(unique_entries) == 1:
-                ColumnsTabDict[column_key] = [clean(list(unique_entries)[0], is_instrument_method)]
-            # Multiple values
-            else:
-                values = []
-                for row in self.valid_data[Column]:
-                    value = clean(row, is_instrument_method)
-                    if value not in values:
-                        values.append(value)
-                ColumnsTabDict[column_key] = values    
+
+            # Distinct values in order of first appearance; only those are cleaned.
+            # Cleaning can map different raw values to the same text (e.g. method paths), so dedupe again.
+            unique_entries = pd.unique(self.valid_data[Column].to_numpy(dtype=object))
+            ColumnsTabDict[column_key] = list(dict.fromkeys(clean(value, is_instrument_method) for value in unique_entries))
 
         col_widths = []
         for col in ColumnsTabDict.keys():
@@ -364,13 +383,14 @@ class Create_Figures:
         
         fig = go.Figure()
    
-        for file_type, group in self.df_Filtered_all.groupby("FileType", sort=False):
+        for file_type, group in self.df_Filtered_all.groupby("FileType", sort=False, observed=True):
             fig.add_trace(go.Scatter(  
-                x=group["DateTime"],
-                y=group[self.y_Label],
+                x=_typed_array(group["DateTime"]),
+                y=_typed_array(group[self.y_Label]),
                 mode="markers",
                 name=str(file_type),
-                text=group["RawFileName"].tolist(),
+                # numpy array instead of a list: plotly validates it in one go instead of per element
+                text=group["RawFileName"].to_numpy(dtype=str),  # type: ignore[arg-type]
                 hovertemplate="<b>%{text}</b><br>%{x}<br>%{y}<extra></extra>",
                 showlegend=True
             ))
@@ -390,6 +410,7 @@ class Create_Figures:
         :rtype: go.Figure
         """
         fig.update_xaxes(
+        type="date", # x values are epoch milliseconds (see _typed_array)
         dtick=24*60*60*1000, # days between ticks
         tickformat="%d \n %b",
         ticklabelmode="period") 
@@ -429,7 +450,7 @@ class Create_Figures:
             color = "blue"  # Distinctive color for median
       
         self.fig.add_trace(go.Scatter(
-                x=self.df_Filtered["DateTime"], y=self.df_Filtered[label],
+                x=_typed_array(self.df_Filtered["DateTime"]), y=_typed_array(self.df_Filtered[label]),
                 name = name,
                 mode='lines',
                 line=dict(color=color))) 
@@ -461,8 +482,8 @@ class Create_Figures:
         self.fig.add_trace(
                   go.Scatter(
                       name=name,
-                      x=self.df_Filtered["DateTime"],
-                      y=self.df_Filtered[label],
+                      x=_typed_array(self.df_Filtered["DateTime"]),
+                      y=_typed_array(self.df_Filtered[label]),
                       marker=dict(color=color),
                       line=dict(width=1),
                       mode='lines',
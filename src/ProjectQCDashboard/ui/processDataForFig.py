@@ -1,11 +1,36 @@
 import pandas as pd
 from datetime import datetime
-from ProjectQCDashboard.config.logger import get_configured_logger
-from ProjectQCDashboard.config.paths import MergedDuckDB
+from ProjectQCDashboard.config.logger import get_configured_logger, span
+from ProjectQCDashboard.db.database import connect_merged
+from ProjectQCDashboard.config.configuration import METRIC_COLUMNS, ROWS_Table
 import duckdb
 
 logger = get_configured_logger(__name__)
 
+# Low-cardinality text columns that are grouped, compared and deduplicated when rendering
+CATEGORICAL_COLUMNS = ["FileType", "ProjectID", *ROWS_Table]
+
+
+def _compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Store low-cardinality text columns as categoricals and metric columns as float64.
+
+    Metrics are DOUBLE in the merged schema already; the coercion only catches databases
+    that were merged before the metric columns were typed.
+
+    :param df: Project data as returned by DuckDB
+    :type df: pd.DataFrame
+    :return: The same DataFrame with compact dtypes
+    :rtype: pd.DataFrame
+    """
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in METRIC_COLUMNS:
+        if col in df.columns and df[col].dtype != "float64":
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+    return df
+
 
 def get_all_data(ProjectID: str) -> pd.DataFrame:
     """
@@ -17,7 +42,7 @@ def get_all_data(ProjectID: str) -> pd.DataFrame:
     :rtype: pd.DataFrame
     """
     try:
-        with duckdb.connect(MergedDuckDB) as con:
+        with connect_merged() as con:
             df = con.execute(
                 """SELECT * FROM project_data
                 WHERE ProjectID LIKE (?)
@@ -43,7 +68,7 @@ def get_project_data(ProjectID: str) -> tuple[pd.DataFrame, pd.DataFrame, str, d
     :rtype: tuple[pd.DataFrame, pd.DataFrame]
     """
     try:
-        with duckdb.connect(MergedDuckDB) as con:
+        with span(logger, "get_project_data", project_id=ProjectID) as timing, connect_merged() as con:
             # Get all data for the project
             all_data = con.execute(
                 """SELECT * FROM project_data
@@ -51,6 +76,8 @@ def get_project_data(ProjectID: str) -> tuple[pd.DataFrame, pd.DataFrame, str, d
                 ORDER BY DateTime ASC""",
                 (ProjectID,)
             ).df()
+            timing["rows"] = len(all_data)
+        all_data = _compact_dtypes(all_data)
         
         # Split into valid and error data in Python
         error_mask = (all_data['Date'] < '2000-01-01') | all_data['Error'].notna()
@@ -75,14 +102,15 @@ def get_project_data(ProjectID: str) -> tuple[pd.DataFrame, pd.DataFrame, str, d
         return pd.DataFrame(), pd.DataFrame(), "", None
 
 def get_data_freshness() -> tuple[datetime | str, int | None]:
-    """Return (last_updated, net_new_rows) from meta_data, or ('', None) if unavailable."""
+    """Return (last_updated, net_new_rows) of the last data update in meta_data, or ('', None) if unavailable."""
     try:
-        with duckdb.connect(MergedDuckDB) as con:
+        with connect_merged() as con:
             row = con.execute(
                 """
                 SELECT updated_at,
                        row_count - LAG(row_count) OVER (ORDER BY updated_at) AS new_rows
                 FROM meta_data
+                WHERE maintenance IS NULL  -- nightly maintenance brings no new data
                 ORDER BY updated_at DESC
                 LIMIT 1
                 """
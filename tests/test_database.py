@@ -1,13 +1,17 @@
 """Tests for ValidateDatabases module and database query helpers."""
 
+import os
 import pytest
 import duckdb
+from collections.abc import Iterator
 from pathlib import Path
+from types import ModuleType
 from unittest.mock import patch
 from ProjectQCDashboard.db.ValidateDatabases import (
     get_table_names,
     _validate_database,
     validate_databases,
+    merged_db_is_recent,
 )
 
 from ProjectQCDashboard.db.database import bump_db_version, get_all_project_ids
@@ -82,6 +86,39 @@ class TestValidateDatabases:
         validate_databases()
 
 
+def _merged_db(path: Path, updated_at: str, rows: int = 1) -> str:
+    """Create a minimal merged DuckDB with project_data rows and one meta_data timestamp."""
+    with duckdb.connect(str(path)) as con:
+        con.execute("CREATE TABLE project_data AS SELECT range AS id FROM range(?)", [rows])
+        con.execute(f"CREATE TABLE meta_data AS SELECT {updated_at} AS updated_at")
+    return str(path)
+
+
+class TestMergedDbIsRecent:
+    """Tests for merged_db_is_recent() — decides whether the app can warm start."""
+
+    def test_fresh_db_is_recent(self, temp_dir: Path) -> None:
+        """A populated DB updated just now can be served."""
+        db = _merged_db(temp_dir / "merged.db", "current_localtimestamp()")
+        assert merged_db_is_recent(db, 24) is True
+
+    def test_old_db_is_not_recent(self, temp_dir: Path) -> None:
+        """A DB whose last update is older than the limit is rebuilt."""
+        db = _merged_db(temp_dir / "merged.db", "current_localtimestamp() - INTERVAL 2 DAY")
+        assert merged_db_is_recent(db, 24) is False
+
+    def test_empty_or_missing_db_is_not_recent(self, temp_dir: Path) -> None:
+        """An empty project_data table or a missing file means a cold start."""
+        db = _merged_db(temp_dir / "merged.db", "current_localtimestamp()", rows=0)
+        assert merged_db_is_recent(db, 24) is False
+        assert merged_db_is_recent(str(temp_dir / "missing.db"), 24) is False
+
+    def test_zero_disables_warm_start(self, temp_dir: Path) -> None:
+        """max_age_hours=0 turns the warm start off."""
+        db = _merged_db(temp_dir / "merged.db", "current_localtimestamp()")
+        assert merged_db_is_recent(db, 0) is False
+
+
 class TestGetAllProjectIds:
     """Tests for get_all_project_ids() — queries project IDs from the merged DuckDB."""
 
@@ -134,4 +171,133 @@ class TestGetAllProjectIds:
             result = get_all_project_ids()
 
         assert result[0] == "NewProject"
-        assert result[1] == "OldProject"
\ No newline at end of file
+        assert result[1] == "OldProject"
+
+@pytest.fixture
+def serving_state(temp_dir: Path) -> Iterator[tuple[ModuleType, Path]]:
+    """Point the database module at a temp merged DB and restore its serving state afterwards."""
+    from ProjectQCDashboard.db import database
+    merged = temp_dir / "merged.db"
+    with duckdb.connect(str(merged)) as con:
+        con.execute("CREATE TABLE project_data AS SELECT 'ProjectA' AS ProjectID, now() AS DateTime")
+    state = ("_role", "_writer_lock_fd", "_snapshot_path", "_version_file_mtime",
+             "_db_version", "_published_version", "_last_publish")
+    saved = {name: getattr(database, name) for name in state}
+    with patch("ProjectQCDashboard.db.database.MergedDuckDB", str(merged)), \
+            patch("ProjectQCDashboard.db.database.SnapshotMinIntervalSeconds", 0):
+        yield database, merged
+    if database._writer_lock_fd is not None and database._writer_lock_fd != saved["_writer_lock_fd"]:
+        os.close(database._writer_lock_fd)
+    for name, value in saved.items():
+        setattr(database, name, value)
+
+
+class TestMultiWorkerServing:
+    """Tests for writer election and snapshot publishing between workers."""
+
+    def test_only_one_writer_is_elected(self, serving_state: tuple[ModuleType, Path]) -> None:
+        """The first process to lock the writer file is the writer, the next one becomes a reader."""
+        database, _ = serving_state
+        assert database.acquire_writer_role() is True
+        first_fd = database._writer_lock_fd
+        # A second open of the lock file competes like another worker process would
+        assert database.acquire_writer_role() is False
+        assert database.get_role() == "reader"
+        database._writer_lock_fd = first_fd
+
+    def test_reader_serves_published_snapshot(self, serving_state: tuple[ModuleType, Path]) -> None:
+        """A version the writer publishes is picked up by a reader from the version file."""
+        database, merged = serving_state
+        database._role = "writer"
+        version = database.bump_db_version()
+        assert database.publish_snapshot_if_due() is True
+
+        snapshot = Path(f"{merged}.v{version}")
+        assert snapshot.exists()
+
+        database._role = "reader"
+        database._version_file_mtime = None
+        assert database.get_db_version() == version
+        with database.connect_merged() as con:
+            assert con.execute("SELECT ProjectID FROM project_data").fetchone() == ("ProjectA",)
+
+    def test_old_snapshots_are_removed(self, serving_state: tuple[ModuleType, Path]) -> None:
+        """Only the last SNAPSHOTS_KEPT snapshots stay on disk."""
+        database, merged = serving_state
+        database._role = "writer"
+        for _ in range(database.SNAPSHOTS_KEPT + 2):
+            version = database.bump_db_version()
+            database.publish_snapshot_if_due()
+
+        snapshots = sorted(p.name for p in merged.parent.glob("merged.db.v*[0-9]"))
+        assert len(snapshots) == database.SNAPSHOTS_KEPT
+        assert f"merged.db.v{version}" in snapshots
+
+    def test_restarted_writer_continues_version_numbering(self, serving_state: tuple[ModuleType, Path]) -> None:
+        """A new writer starts above the versions left by the previous one, so its snapshot is not pruned."""
+        database, merged = serving_state
+        for old_version in (56, 57):
+            Path(f"{merged}.v{old_version}").write_bytes(merged.read_bytes())
+        database._db_version = 0
+
+        assert database.acquire_writer_role() is True
+        version = database.bump_db_version()
+        database.publish_snapshot_if_due()
+
+        assert version == 58
+        assert Path(f"{merged}.v58").exists()
+        database._role = "reader"
+        database._version_file_mtime = None
+        assert database.get_db_version() == 58
+        with database.connect_merged() as con:
+            assert con.execute("SELECT ProjectID FROM project_data").fetchone() == ("ProjectA",)
+
+    def test_bumps_within_interval_share_one_snapshot(self, serving_state: tuple[ModuleType, Path]) -> None:
+        """Bumps shortly after a snapshot are published together once SnapshotMinIntervalSeconds passed."""
+        database, merged = serving_state
+        database._role = "writer"
+        with patch("ProjectQCDashboard.db.database.SnapshotMinIntervalSeconds", 30):
+            first = database.bump_db_version()
+            assert database.publish_snapshot_if_due() is True
+            database.bump_db_version()
+            last = database.bump_db_version()
+            assert database.publish_snapshot_if_due() is False
+
+            database._last_publish -= 30
+            assert database.publish_snapshot_if_due() is True
+        snapshots = sorted(p.name for p in merged.parent.glob("merged.db.v*[0-9]"))
+        assert snapshots == sorted([f"merged.db.v{first}", f"merged.db.v{last}"])
+
+    def test_failed_publish_is_retried(self, serving_state: tuple[ModuleType, Path]) -> None:
+        """A snapshot that could not be published stays pending and is published by a later call."""
+        database, merged = serving_state
+        database._role = "writer"
+        version = database.bump_db_version()
+        with patch("ProjectQCDashboard.db.database._publish_snapshot", return_value=False):
+            assert database.publish_snapshot_if_due() is False
+
+        assert database.publish_snapshot_if_due() is True
+        assert Path(f"{merged}.v{version}").exists()
+
+
+class TestWaitForDbVersion:
+    """Tests for wait_for_db_version() — the long-poll behind api/db-version."""
+
+    def test_returns_when_version_is_bumped(self) -> None:
+        """A waiting client is woken up by bump_db_version instead of waiting for the timeout."""
+        import threading
+        import time
+        from ProjectQCDashboard.db.database import get_db_version, wait_for_db_version
+
+        since = get_db_version()
+        threading.Timer(0.2, bump_db_version).start()
+        start = time.monotonic()
+        assert wait_for_db_version(since, timeout=10) == since + 1
+        assert time.monotonic() - start < 5
+
+    def test_returns_unchanged_version_on_timeout(self) -> None:
+        """Without a bump the current version is returned after the timeout."""
+        from ProjectQCDashboard.db.database import get_db_version, wait_for_db_version
+
+        since = get_db_version()
+        assert wait_for_db_version(since, timeout=0.1) == since
@@ -8,6 +8,7 @@ from ProjectQCDashboard.ui.Figures import (
     DataframeForFig,
     Create_Figures
 )
+from ProjectQCDashboard.ui.AppLayoutComponents import FigureComponents
 from typing import Any
 
 
@@ -103,7 +104,27 @@ class TestCreateFigures:
         assert fig_gen.nrows_valid_data == 10
         assert isinstance(fig, go.Figure)
         assert len(fig.data) > 0
-    
+
+    @patch('ProjectQCDashboard.ui.Figures.get_project_data')
+    def test_generate_fig_serializes_typed_arrays(self, mock_get_data: Any) -> None:
+        """Test that x (datetime) and y (metric) are sent as base64 typed arrays on a date axis."""
+        mock_valid = pd.DataFrame({
+            'DateTime': pd.date_range('2025-01-01', periods=40),
+            'FileType': ['Sample'] * 40,
+            'RawFileName': [f'file_{i}' for i in range(40)],
+            'MS1.TIC': np.random.rand(40) * 1000000
+        })
+        mock_error = pd.DataFrame(columns=['RawFileName', 'Error'])
+        mock_get_data.return_value = (mock_valid, mock_error, '', None)
+
+        fig_dict = Create_Figures('Test_Project').generate_fig('MS1.TIC').to_dict()
+
+        for trace in fig_dict['data'][:4]:  # scatter + rolling Upper/Lower/Median
+            assert trace['x']['dtype'] == 'f8' and 'bdata' in trace['x']
+            assert trace['y']['dtype'] == 'f8' and 'bdata' in trace['y']
+        assert fig_dict['layout']['xaxis']['type'] == 'date'
+        assert fig_dict['data'][0]['text'][0] == 'file_0'
+
     @patch('ProjectQCDashboard.ui.Figures.get_project_data')
     def test_generate_fig_no_data(self, mock_get_data: Any) -> None:
         """Test figure generation with no data."""
@@ -143,6 +164,23 @@ class TestCreateFigures:
         assert isinstance(fig, go.Figure)
         assert len(fig.data) > 0
     
+    @patch('ProjectQCDashboard.ui.Figures.get_project_data')
+    def test_create_table_project_data_ordered_unique_values(self, mock_get_data: Any) -> None:
+        """Test that table cells list distinct cleaned values in order of first appearance."""
+        mock_valid = pd.DataFrame({
+            'DateTime': pd.date_range('2025-01-01', periods=6),
+            'MSInstrument': pd.Categorical(['B', 'A', 'B', None, 'A', 'B']),
+            'InstrumentMethod_print': ['C:\\Methods\\m1.meth', 'D:\\Other\\m1.meth', 'C:\\Methods\\m2.meth',
+                                       'C:\\Methods\\m1.meth', 'C:\\Methods\\m2.meth', 'C:\\Methods\\m1.meth'],
+        })
+        mock_error = pd.DataFrame(columns=['RawFileName', 'Error'])
+        mock_get_data.return_value = (mock_valid, mock_error, '', None)
+
+        fig = Create_Figures('Test_Project').create_table_project_data(['MSInstrument', 'InstrumentMethod_print'])
+
+        assert list(fig.data[0].header.values) == ['MSInstrument', 'InstrumentMethod']
+        assert [list(col) for col in fig.data[0].cells.values] == [['B', 'A', 'not available'], ['m1.meth', 'm2.meth']]
+
     @patch('ProjectQCDashboard.ui.Figures.get_project_data')
     def test_create_table_error_with_errors(self, mock_get_data: Any) -> None:
         """Test error table creation with error data."""
@@ -183,3 +221,49 @@ class TestCreateFigures:
         assert fig_gen._format_val(0.001) == "0.00"
         assert fig_gen._format_val(None) == "n/a"
         assert fig_gen._format_val(np.nan) == "n/a"
+
+
+class TestFigureComponents:
+    """Test suite for FigureComponents class."""
+
+    @patch('ProjectQCDashboard.ui.Figures.get_project_data')
+    def test_generate_all_figures_only_selected_keys(self, mock_get_data: Any) -> None:
+        """Test that only the requested plot keys are built, in PLOT_CONFIG order."""
+        mock_valid = pd.DataFrame({
+            'DateTime': pd.date_range('2025-01-01', periods=10),
+            'FileType': ['Sample'] * 10,
+            'RawFileName': [f'file_{i}' for i in range(10)],
+            'Protein': np.random.rand(10) * 1000,
+            'msms.count': np.random.rand(10) * 1000,
+        })
+        mock_error = pd.DataFrame(columns=['RawFileName', 'Error'])
+        mock_get_data.return_value = (mock_valid, mock_error, '', None)
+
+        with patch('ProjectQCDashboard.ui.AppLayoutComponents.DEFAULT_PLOTS',
+                   {'Protein': 'Protein', 'msms_count': 'msms.count', 'Other': 'Other'}):
+            figs, row_count = FigureComponents('Test_Project').generate_all_figures(['msms_count', 'Protein'])
+
+        assert row_count == 10
+        assert figs is not None and len(figs) == 2
+        assert figs[0].data[0].y[0] == mock_valid['Protein'].iloc[0]
+        assert figs[1].data[0].y[0] == mock_valid['msms.count'].iloc[0]
+
+    @patch('ProjectQCDashboard.ui.Figures.get_project_data')
+    def test_generate_all_figures_parallel_keeps_order(self, mock_get_data: Any) -> None:
+        """Test that figures built on the thread pool come back in PLOT_CONFIG order."""
+        plots = {f'key_{i}': f'metric_{i}' for i in range(6)}
+        mock_valid = pd.DataFrame({
+            'DateTime': pd.date_range('2025-01-01', periods=40),
+            'FileType': ['Sample'] * 40,
+            'RawFileName': [f'file_{i}' for i in range(40)],
+            **{y_label: np.full(40, float(i)) for i, y_label in enumerate(plots.values())},
+        })
+        mock_error = pd.DataFrame(columns=['RawFileName', 'Error'])
+        mock_get_data.return_value = (mock_valid, mock_error, '', None)
+
+        with patch('ProjectQCDashboard.ui.AppLayoutComponents.DEFAULT_PLOTS', plots), \
+             patch('ProjectQCDashboard.ui.AppLayoutComponents.FigureWorkers', 3):
+            figs, _ = FigureComponents('Test_Project').generate_all_figures()
+
+        assert figs is not None
+        assert [fig.data[0].y[0] for fig in figs] == [float(i) for i in range(6)]
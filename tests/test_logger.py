@@ -0,0 +1,116 @@
+"""Tests for the timing spans, correlation IDs and queued log pipeline in the logger module."""
+
+import json
+import logging
+import queue
+import sys
+import threading
+import pytest
+from ProjectQCDashboard.config.logger import (
+    CorrelationIdFilter,
+    StructuredQueueHandler,
+    berlin_time,
+    formatter,
+    correlation,
+    correlation_id,
+    propagate_correlation,
+    span,
+)
+
+test_logger = logging.getLogger("test_span")
+
+
+class TestSpan:
+    """Tests for span() — timed blocks logged as span_finished."""
+
+    def test_logs_duration_and_fields(self, caplog: pytest.LogCaptureFixture) -> None:
+        """The record carries the span name, a duration, the given fields and what the block added."""
+        with caplog.at_level(logging.INFO, logger="test_span"):
+            with span(test_logger, "merge", source="mqqc") as timing:
+                timing["rows"] = 3
+
+        record = caplog.records[-1]
+        assert record.getMessage() == "span_finished"
+        assert record.span == "merge"
+        assert record.source == "mqqc"
+        assert record.rows == 3
+        assert record.status == "ok"
+        assert record.duration_ms >= 0
+
+    def test_failure_is_logged_and_reraised(self, caplog: pytest.LogCaptureFixture) -> None:
+        """An exception in the block marks the span as failed and propagates."""
+        with caplog.at_level(logging.INFO, logger="test_span"):
+            with pytest.raises(ValueError):
+                with span(test_logger, "sync"):
+                    raise ValueError("boom")
+
+        record = caplog.records[-1]
+        assert record.status == "error"
+        assert record.error_class == "ValueError"
+
+    def test_works_as_decorator(self, caplog: pytest.LogCaptureFixture) -> None:
+        """Each call of a decorated function is one span."""
+        @span(test_logger, "decorated")
+        def work() -> int:
+            return 1
+
+        with caplog.at_level(logging.INFO, logger="test_span"):
+            assert work() == 1
+            assert work() == 1
+
+        assert [r.span for r in caplog.records] == ["decorated", "decorated"]
+
+
+class TestCorrelation:
+    """Tests for correlation IDs of flushes and requests."""
+
+    def test_filter_adds_id_inside_block_only(self) -> None:
+        """Records get the correlation_id while a correlation block is active."""
+        log_filter = CorrelationIdFilter()
+        with correlation("flush") as cid:
+            inside = logging.LogRecord("x", logging.INFO, __file__, 1, "msg", None, None)
+            log_filter.filter(inside)
+        outside = logging.LogRecord("x", logging.INFO, __file__, 1, "msg", None, None)
+        log_filter.filter(outside)
+
+        assert cid.startswith("flush-")
+        assert inside.correlation_id == cid
+        assert not hasattr(outside, "correlation_id")
+
+    def test_id_is_propagated_to_worker_threads(self) -> None:
+        """propagate_correlation hands the caller's ID to a function run in another thread."""
+        seen: list[str | None] = []
+        with correlation("flush") as cid:
+            worker = threading.Thread(target=propagate_correlation(lambda: seen.append(correlation_id.get())))
+            worker.start()
+            worker.join()
+
+        assert seen == [cid]
+
+
+class TestQueuedLogging:
+    """Tests for the queue-based log pipeline."""
+
+    def test_timestamp_is_converted_from_record_time(self) -> None:
+        """berlin_time converts the given time, so late formatting keeps the logging time."""
+        winter = berlin_time(1767225600)  # 2026-01-01 00:00 UTC
+        summer = berlin_time(1782864000)  # 2026-07-01 00:00 UTC
+        assert (winter.tm_hour, winter.tm_isdst) == (1, 0)
+        assert (summer.tm_hour, summer.tm_isdst) == (2, 1)
+
+    def test_queued_record_keeps_json_fields(self) -> None:
+        """A record taken from the queue formats to the same JSON fields, traceback included."""
+        log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        handler = StructuredQueueHandler(log_queue)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("x", logging.ERROR, __file__, 1, "sync_%s_failed", ("db",), sys.exc_info())
+        record.error_class = "ValueError"
+
+        handler.handle(record)
+        output = json.loads(formatter.format(log_queue.get_nowait()))
+
+        assert output["message"] == "sync_db_failed"
+        assert output["error_class"] == "ValueError"
+        assert "ValueError: boom" in output["exc_info"]
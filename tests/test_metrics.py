@@ -0,0 +1,69 @@
+"""Tests for the metrics module behind the /metrics route."""
+
+import sqlite3
+import pytest
+from contextlib import closing
+from pathlib import Path
+from ProjectQCDashboard.config import metrics
+from ProjectQCDashboard.config.metrics import Counter, Gauge, Histogram, SYNC_BYTES, render_metrics
+from ProjectQCDashboard.db.SyncDatabases import sync_database
+
+
+@pytest.fixture
+def fresh_registry(monkeypatch: pytest.MonkeyPatch) -> list[metrics._Metric]:
+    """Register the metrics created in a test in an empty registry, so they do not show up in /metrics later."""
+    registry: list[metrics._Metric] = []
+    monkeypatch.setattr(metrics, "_registry", registry)
+    return registry
+
+
+@pytest.mark.usefixtures("fresh_registry")
+class TestMetrics:
+    """Tests for Counter, Gauge, Histogram and the Prometheus text output."""
+
+    def test_counter_and_gauge_render_per_label_set(self) -> None:
+        """Each label combination is its own sample line."""
+        flushes = Counter("test_flushes_total", "Test flushes")
+        flushes.inc(outcome="ok")
+        flushes.inc(2, outcome="error")
+        depth = Gauge("test_depth", "Test depth")
+        depth.set(3)
+
+        text = render_metrics()
+        assert "projectqc_queue_flushes_total" not in text  # only the metrics of this test
+        assert "# TYPE projectqc_test_flushes_total counter" in text
+        assert 'projectqc_test_flushes_total{outcome="ok"} 1' in text
+        assert 'projectqc_test_flushes_total{outcome="error"} 2' in text
+        assert "projectqc_test_depth 3" in text
+
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        """An observation counts in its bucket and every larger one, plus sum and count."""
+        latency = Histogram("test_latency_seconds", "Test latency", buckets=(0.1, 1))
+        latency.observe(0.05)
+        latency.observe(0.5)
+
+        text = render_metrics()
+        assert 'projectqc_test_latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'projectqc_test_latency_seconds_bucket{le="1"} 2' in text
+        assert 'projectqc_test_latency_seconds_bucket{le="+Inf"} 2' in text
+        assert "projectqc_test_latency_seconds_sum 0.55" in text
+        assert "projectqc_test_latency_seconds_count 2" in text
+
+    def test_label_values_are_escaped(self) -> None:
+        """Quotes in label values do not break the text format."""
+        errors = Counter("test_errors_total", "Test errors")
+        errors.inc(callback='a"b')
+
+        assert 'projectqc_test_errors_total{callback="a\\"b"} 1' in render_metrics()
+
+    def test_full_sync_counts_copied_bytes(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """A full copy adds the size of the copied database to sync_bytes_total of its source."""
+        source = test_db_paths["mqqc"].name
+        before = SYNC_BYTES.value(source=source)
+
+        assert sync_database(str(test_db_paths["mqqc"]), str(temp_dir / "synced.sqlite")) is True
+
+        with closing(sqlite3.connect(str(temp_dir / "synced.sqlite"))) as con:
+            page_size = con.execute("PRAGMA page_size").fetchone()[0]
+            page_count = con.execute("PRAGMA page_count").fetchone()[0]
+        assert SYNC_BYTES.value(source=source) - before == page_size * page_count
@@ -1,10 +1,11 @@
 """Tests for Observer module."""
 
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, patch, mock_open
 from pathlib import Path
 from queue import Queue
 import threading
-from ProjectQCDashboard.background.observer import myHandler, Observer_DBs, start_observer
+from ProjectQCDashboard.background.observer import (myHandler, Observer_DBs, StatWatcher, start_observer,
+                                                    select_backend, _filesystem_type)
 
 
 class TestMyHandler:
@@ -60,6 +61,28 @@ class TestMyHandler:
         assert q.get() == "/test/database.db"
 
 
+    def test_wal_and_journal_events_map_to_database(self) -> None:
+        """Events on -wal/-journal companions queue their database."""
+        q: Queue[str | Path] = Queue()
+        handler = myHandler(q, watched_files=["/test/database.db", "/test/meta.db"])
+        for path, event in [("/test/database.db-wal", handler.on_modified),
+                            ("/test/meta.db-journal", handler.on_created),
+                            ("/test/meta.db-journal", handler.on_deleted)]:
+            mock_event = Mock()
+            mock_event.src_path = path
+            event(mock_event)
+        assert [q.get(), q.get(), q.get()] == ["/test/database.db", "/test/meta.db", "/test/meta.db"]
+
+    def test_unrelated_companion_and_deleted_database_are_ignored(self) -> None:
+        q: Queue[str | Path] = Queue()
+        handler = myHandler(q, watched_files=["/test/database.db"])
+        for path, event in [("/test/other.db-wal", handler.on_modified),
+                            ("/test/database.db", handler.on_deleted)]:
+            mock_event = Mock()
+            mock_event.src_path = path
+            event(mock_event)
+        assert q.empty()
+
 
 class TestObserverDBs:
     """Test suite for Observer_DBs class."""
@@ -73,6 +96,7 @@ class TestObserverDBs:
         assert observer.q is q
 
 
+    @patch("ProjectQCDashboard.background.observer.ObserverBackend", "directory")
     @patch("ProjectQCDashboard.background.observer.DB_Paths_towatch", ["/dir1", "/dir2"])
     @patch("ProjectQCDashboard.background.observer.start_observer")
     def test_start_observing_success(self, mock_start_observer: Mock) -> None:
@@ -90,6 +114,7 @@ class TestObserverDBs:
         assert len(observer.Observer_list) == 2
         assert mock_start_observer.call_count == 2
 
+    @patch("ProjectQCDashboard.background.observer.ObserverBackend", "directory")
     @patch("ProjectQCDashboard.background.observer.DB_Paths_towatch", ["/dir1", "/dir2"])
     @patch("ProjectQCDashboard.background.observer.start_observer")
     def test_start_observing_with_failure(self, mock_start_observer: Mock) -> None:
@@ -144,3 +169,115 @@ class TestStartObserver:
         assert result == mock_observer
         mock_observer.schedule.assert_called_once_with(handler, path=watch_dir, recursive=False)
         mock_observer.start.assert_called_once()
+
+
+class TestStatWatcher:
+    """Test suite for StatWatcher — stat-only polling of the watched database files."""
+
+    def test_no_change_queues_nothing(self, temp_dir: Path) -> None:
+        db = temp_dir / "list_collect.sqlite"
+        db.write_bytes(b"data")
+        q: Queue[str | Path] = Queue()
+        watcher = StatWatcher(q, [db.as_posix()])
+        assert watcher.check() == []
+        assert q.empty()
+
+    def test_modified_database_is_queued(self, temp_dir: Path) -> None:
+        db = temp_dir / "list_collect.sqlite"
+        db.write_bytes(b"data")
+        q: Queue[str | Path] = Queue()
+        watcher = StatWatcher(q, [db.as_posix()])
+        db.write_bytes(b"more data")
+        assert watcher.check() == [db.as_posix()]
+        assert q.get() == db.as_posix()
+        assert watcher.check() == []
+
+    def test_wal_change_is_queued_as_database(self, temp_dir: Path) -> None:
+        """A new -wal file is reported as a change of its database."""
+        db = temp_dir / "list_collect.sqlite"
+        db.write_bytes(b"data")
+        q: Queue[str | Path] = Queue()
+        watcher = StatWatcher(q, [db.as_posix()])
+        Path(db.as_posix() + "-wal").write_bytes(b"frame")
+        assert watcher.check() == [db.as_posix()]
+
+    @patch("ProjectQCDashboard.background.observer.ObserverBackend", "stat")
+    @patch("ProjectQCDashboard.background.observer.external_meta", "/test/meta.db")
+    @patch("ProjectQCDashboard.background.observer.external_mqqc", ["/test/database.db"])
+    @patch("ProjectQCDashboard.background.observer.start_observer")
+    def test_start_observing_uses_one_thread(self, mock_start_observer: Mock) -> None:
+        q: Queue[str | Path] = Queue()
+        observer = Observer_DBs(q)
+        stop_event = threading.Event()
+        threading.Timer(0.1, stop_event.set).start()
+        observer.start_observing(stop_event)
+        mock_start_observer.assert_not_called()
+        assert len(observer.Observer_list) == 1
+        assert isinstance(observer.Observer_list[0], StatWatcher)
+        assert not observer.Observer_list[0].is_alive()
+
+    def test_interval_backs_off_when_idle_and_resets_on_change(self, temp_dir: Path) -> None:
+        """An idle source is polled less and less often, a change brings it back to the fast interval."""
+        db = temp_dir / "list_collect.sqlite"
+        db.write_bytes(b"data")
+        q: Queue[str | Path] = Queue()
+        watcher = StatWatcher(q, [db.as_posix()], min_interval=5, max_interval=30)
+        path = db.as_posix()
+
+        intervals = []
+        for _ in range(4):
+            watcher.check()
+            intervals.append(watcher.intervals[path])
+        assert intervals == [10, 20, 30, 30]
+
+        db.write_bytes(b"more data")
+        watcher.check()
+        assert watcher.intervals[path] == 5
+
+
+MOUNTS = """overlay / overlay rw,relatime 0 0
+/dev/sda1 /external_db_1 ext4 rw,relatime 0 0
+server:/export /external_db_2 nfs4 rw,relatime 0 0
+//nas/share /external_db_3 cifs rw,relatime 0 0
+"""
+
+
+class TestBackendSelection:
+    """Test suite for choosing inotify or stat polling per watched directory."""
+
+    @patch("builtins.open", mock_open(read_data=MOUNTS))
+    def test_filesystem_type_uses_longest_mount(self) -> None:
+        assert _filesystem_type("/external_db_1") == "ext4"
+        assert _filesystem_type("/external_db_2/sub") == "nfs4"
+        assert _filesystem_type("/somewhere/else") == "overlay"
+
+    @patch("builtins.open", mock_open(read_data=MOUNTS))
+    def test_network_mounts_are_polled(self) -> None:
+        assert select_backend("/external_db_1") == ("inotify", "ext4")
+        assert select_backend("/external_db_2") == ("stat", "nfs4")
+        assert select_backend("/external_db_3") == ("stat", "cifs")
+
+    @patch("builtins.open", side_effect=OSError("no /proc"))
+    def test_unknown_filesystem_is_polled(self, _mock_open: Mock) -> None:
+        assert select_backend("/external_db_1") == ("stat", None)
+
+    @patch("ProjectQCDashboard.background.observer.ObserverBackend", "auto")
+    @patch("ProjectQCDashboard.background.observer.DB_Paths_towatch", ["/dir1", "/dir2"])
+    @patch("ProjectQCDashboard.background.observer.external_meta", "/dir2/meta.db")
+    @patch("ProjectQCDashboard.background.observer.external_mqqc", ["/dir1/database.db"])
+    @patch("ProjectQCDashboard.background.observer.start_inotify_observer")
+    @patch("ProjectQCDashboard.background.observer.select_backend")
+    def test_auto_polls_only_network_directories(self, mock_select: Mock, mock_inotify: Mock) -> None:
+        """A local directory gets an inotify observer, the files on a network mount a stat watcher."""
+        mock_select.side_effect = lambda d: ("inotify", "ext4") if d == "/dir1" else ("stat", "nfs4")
+        q: Queue[str | Path] = Queue()
+        observer = Observer_DBs(q)
+        stop_event = threading.Event()
+        threading.Timer(0.1, stop_event.set).start()
+        observer.start_observing(stop_event)
+
+        mock_inotify.assert_called_once()
+        assert mock_inotify.call_args[0][1] == "/dir1"
+        watchers = [o for o in observer.Observer_list if isinstance(o, StatWatcher)]
+        assert len(watchers) == 1
+        assert watchers[0].watched_files == ["/dir2/meta.db"]
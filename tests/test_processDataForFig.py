@@ -53,6 +53,33 @@ class TestProcessDataForFig:
         assert 'RawFileName' in error_data.columns
         assert 'Error' in error_data.columns
     
+    @patch('ProjectQCDashboard.ui.processDataForFig.duckdb.connect')
+    def test_get_project_data_compact_dtypes(self, mock_connect: Mock) -> None:
+        """Test that text columns become categoricals and metrics float64."""
+        mock_con = MagicMock()
+        mock_connect.return_value.__enter__.return_value = mock_con
+
+        mock_df = pd.DataFrame({
+            'ProjectID': ['Test_Project'] * 4,
+            'DateTime': pd.date_range('2025-01-01', periods=4),
+            'Date': pd.date_range('2025-01-01', periods=4),
+            'RawFileName': [f'file_{i}' for i in range(4)],
+            'FileType': ['Sample', 'HSstd', 'Sample', 'Sample'],
+            'MSInstrument': ['Exploris'] * 4,
+            'Error': [None] * 4,
+            'Protein': ['1000', '1200', 'n/a', None],
+        })
+        mock_con.execute.return_value.df.return_value = mock_df
+
+        valid_data, *_ = get_project_data('Test_Project')
+
+        assert isinstance(valid_data['FileType'].dtype, pd.CategoricalDtype)
+        assert isinstance(valid_data['ProjectID'].dtype, pd.CategoricalDtype)
+        assert isinstance(valid_data['MSInstrument'].dtype, pd.CategoricalDtype)
+        assert valid_data['Protein'].dtype == 'float64'
+        assert valid_data['Protein'].iloc[:2].tolist() == [1000.0, 1200.0]
+        assert valid_data['Protein'].iloc[2:].isna().all()
+
     @patch('ProjectQCDashboard.ui.processDataForFig.duckdb.connect')
     def test_get_project_data_error(self, mock_connect: Mock) -> None:
         """Test error handling in get_project_data."""
@@ -0,0 +1,79 @@
+"""Tests for processQ module — when queued database changes are flushed."""
+
+from datetime import datetime
+from unittest.mock import patch
+from ProjectQCDashboard.background.processQ import FlushScheduler, MaintenanceWindow
+from ProjectQCDashboard.config.schemas import FlushSettings
+
+
+SETTINGS = {
+    "mqqc": FlushSettings(DebounceSeconds=5, MaxStalenessSeconds=30),
+    "meta": FlushSettings(DebounceSeconds=10, MaxStalenessSeconds=60),
+}
+
+
+@patch("ProjectQCDashboard.background.processQ.external_meta", "/test/meta.db")
+@patch("ProjectQCDashboard.background.processQ.external_mqqc", ["/test/database.db"])
+class TestFlushScheduler:
+    """Test suite for FlushScheduler — debounce plus maximum staleness per source."""
+
+    def test_flush_after_quiet_period(self) -> None:
+        scheduler = FlushScheduler(SETTINGS)
+        scheduler.add("/test/database.db", 0.0)
+        assert scheduler.due(4.9) == {}
+        assert scheduler.seconds_until_due(4.0) == 1.0
+        assert scheduler.due(5.0) == {"/test/database.db": "debounce"}
+
+    def test_steady_stream_is_flushed_at_max_staleness(self) -> None:
+        """An event every 2 s never leaves a 5 s quiet window, the deadline still forces the flush."""
+        scheduler = FlushScheduler(SETTINGS)
+        for t in range(0, 30, 2):
+            scheduler.add("/test/database.db", float(t))
+            assert scheduler.due(float(t)) == {}
+        assert scheduler.due(30.0) == {"/test/database.db": "max_staleness"}
+
+    def test_settings_are_per_source(self) -> None:
+        scheduler = FlushScheduler(SETTINGS)
+        scheduler.add("/test/database.db", 0.0)
+        scheduler.add("/test/meta.db", 0.0)
+        assert set(scheduler.due(6.0)) == {"/test/database.db"}
+        assert set(scheduler.due(10.0)) == {"/test/database.db", "/test/meta.db"}
+
+    def test_unknown_source_uses_defaults(self) -> None:
+        scheduler = FlushScheduler({})
+        scheduler.add("/test/other.db", 0.0)
+        assert scheduler.due(FlushSettings().DebounceSeconds) == {"/test/other.db": "debounce"}
+
+    def test_pop_reports_time_to_flush_and_coalesced_events(self) -> None:
+        scheduler = FlushScheduler(SETTINGS)
+        scheduler.add("/test/database.db", 0.0)
+        scheduler.add("/test/database.db", 1.0)
+        scheduler.add("/test/meta.db", 2.0)
+
+        stats = scheduler.pop(["/test/database.db"], 6.0)
+
+        assert stats == {"time_to_flush_ms": 6000.0, "coalesced_events": 2}
+        assert scheduler.pending == ["/test/meta.db"]
+
+
+class TestMaintenanceWindow:
+    """Test suite for MaintenanceWindow — once per off-peak window."""
+
+    def test_due_once_inside_window(self) -> None:
+        window = MaintenanceWindow("rebuild", start_hour=3, hours=2)
+        assert not window.due(datetime(2026, 1, 10, 2, 59))
+        assert window.due(datetime(2026, 1, 10, 3, 30))
+        window.mark_done(datetime(2026, 1, 10, 3, 30))
+        assert not window.due(datetime(2026, 1, 10, 4, 0))
+        assert not window.due(datetime(2026, 1, 10, 5, 0))
+        assert window.due(datetime(2026, 1, 11, 3, 0))
+
+    def test_window_across_midnight(self) -> None:
+        window = MaintenanceWindow("checkpoint", start_hour=23, hours=3)
+        assert window.due(datetime(2026, 1, 11, 1, 0))
+        window.mark_done(datetime(2026, 1, 11, 1, 0))
+        assert not window.due(datetime(2026, 1, 11, 1, 30))
+        assert not window.due(datetime(2026, 1, 11, 2, 0))
+
+    def test_off_is_never_due(self) -> None:
+        assert not MaintenanceWindow("off", start_hour=3, hours=2).due(datetime(2026, 1, 10, 3, 30))
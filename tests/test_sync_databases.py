@@ -1,9 +1,15 @@
 """Tests for SyncDatabases module."""
 
+import os
 import sqlite3
+import shutil
 from pathlib import Path
-from ProjectQCDashboard.db.SyncDatabases import sync_database
+from functools import partial
+from unittest.mock import patch
+from ProjectQCDashboard.db.SyncDatabases import (sync_database, sync_concurrently, _delta_sync, _throttled_backup,
+                                                  source_fingerprint, _fingerprint_connections, sync_external_sources)
 from contextlib import closing
+from ProjectQCDashboard.config.metrics import SYNC_SECONDS, SYNC_THROUGHPUT
 
 class TestSyncDatabase:
     """Tests for sync_database() — copies SQLite databases from source to destination."""
@@ -66,4 +72,186 @@ class TestSyncDatabase:
         assert result is True
         with closing(sqlite3.connect(str(dest))) as con:
             count = con.execute("SELECT COUNT(*) FROM SingleFileReport").fetchone()[0]
-        assert count == 261
\ No newline at end of file
+        assert count == 261
+
+    def test_sync_skips_unchanged_source(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """With skip_unchanged=True an unchanged source is not copied again but still counts as success."""
+        src = temp_dir / "source.sqlite"
+        shutil.copy(test_db_paths["mqqc"], src)
+        dest = temp_dir / "synced.sqlite"
+
+        first: list[str] = []
+        assert sync_database(str(src), str(dest), skip_unchanged=True, copied=first) is True
+        assert first == [str(src)]
+
+        second: list[str] = []
+        assert sync_database(str(src), str(dest), skip_unchanged=True, copied=second) is True
+        assert second == []
+
+    def test_sync_copies_again_after_source_change(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """A commit to the source changes its fingerprint, so the next sync copies it."""
+        src = temp_dir / "source.sqlite"
+        shutil.copy(test_db_paths["mqqc"], src)
+        dest = temp_dir / "synced.sqlite"
+        sync_database(str(src), str(dest), skip_unchanged=True)
+
+        with closing(sqlite3.connect(str(src))) as con:
+            with con:
+                con.execute("INSERT INTO SingleFileReport (Name) VALUES ('new_sample')")
+
+        copied: list[str] = []
+        assert sync_database(str(src), str(dest), skip_unchanged=True, copied=copied) is True
+        assert copied == [str(src)]
+        with closing(sqlite3.connect(str(dest))) as con:
+            assert con.execute("SELECT COUNT(*) FROM SingleFileReport WHERE Name = 'new_sample'").fetchone()[0] == 1
+
+    def test_sync_copies_unchanged_source_when_destination_missing(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """An unchanged source is copied again if its destination was removed."""
+        src = temp_dir / "source.sqlite"
+        shutil.copy(test_db_paths["mqqc"], src)
+        dest = temp_dir / "synced.sqlite"
+        sync_database(str(src), str(dest), skip_unchanged=True)
+        dest.unlink()
+
+        copied: list[str] = []
+        assert sync_database(str(src), str(dest), skip_unchanged=True, copied=copied) is True
+        assert copied == [str(src)]
+        assert dest.exists()
+
+    def test_fingerprint_follows_replaced_source(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """Replacing the source file changes the fingerprint and reopens the data_version connection on the new file."""
+        src = temp_dir / "source.sqlite"
+        shutil.copy(test_db_paths["mqqc"], src)
+        first = source_fingerprint(src)
+
+        replacement = temp_dir / "replacement.sqlite"
+        shutil.copy(test_db_paths["mqqc"], replacement)
+        os.replace(replacement, src)
+
+        try:
+            assert source_fingerprint(src) != first
+            _, file_id = _fingerprint_connections[str(src)]
+            assert file_id == (os.stat(src).st_dev, os.stat(src).st_ino)
+        finally:
+            _fingerprint_connections.pop(str(src))[0].close()
+
+    def test_fingerprint_keeps_no_connection_on_network_mount(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """On a network mount no connection is held on the source; commits still change the fingerprint."""
+        src = temp_dir / "source.sqlite"
+        shutil.copy(test_db_paths["mqqc"], src)
+
+        with patch("ProjectQCDashboard.db.SyncDatabases._filesystem_type", return_value="cifs"), \
+                patch.dict("ProjectQCDashboard.db.SyncDatabases._local_sources", clear=True):
+            first = source_fingerprint(src)
+            with closing(sqlite3.connect(str(src))) as con:
+                with con:
+                    con.execute("INSERT INTO SingleFileReport (Name) VALUES ('new_sample')")
+
+            assert source_fingerprint(src) != first
+            assert str(src) not in _fingerprint_connections
+
+    def test_delta_sync_copies_new_rows(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """Delta sync appends new source rows and refreshes edits in the tail window."""
+        src = temp_dir / "source.sqlite"
+        shutil.copy(test_db_paths["mqqc"], src)
+        dest = temp_dir / "synced.sqlite"
+        sync_database(str(src), str(dest))
+
+        with closing(sqlite3.connect(str(src))) as con:
+            last_rowid = con.execute("SELECT MAX(rowid) FROM SingleFileReport").fetchone()[0]
+            con.execute("UPDATE SingleFileReport SET Name = 'edited_sample' WHERE rowid = ?", (last_rowid,))
+            con.execute("INSERT INTO SingleFileReport (Name) VALUES ('new_sample')")
+            con.commit()
+
+        rows_written = _delta_sync(str(src), str(dest), tail_rows=5)
+        assert rows_written == 6  # the last 5 rows again plus the new row
+
+        with closing(sqlite3.connect(str(src))) as s, closing(sqlite3.connect(str(dest))) as d:
+            query = "SELECT rowid, * FROM SingleFileReport ORDER BY rowid"
+            assert s.execute(query).fetchall() == d.execute(query).fetchall()
+
+    def test_delta_sync_falls_back_on_schema_change(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """A schema change in the source makes the delta sync fall back to a full backup."""
+        src = temp_dir / "source.sqlite"
+        shutil.copy(test_db_paths["mqqc"], src)
+        dest = temp_dir / "synced.sqlite"
+        sync_database(str(src), str(dest))
+
+        with closing(sqlite3.connect(str(src))) as con:
+            con.execute("ALTER TABLE SingleFileReport ADD COLUMN NewMetric REAL")
+            con.commit()
+
+        assert _delta_sync(str(src), str(dest)) is None
+        assert sync_database(str(src), str(dest), delta=True) is True
+        with closing(sqlite3.connect(str(dest))) as con:
+            columns = [row[1] for row in con.execute("PRAGMA table_info(SingleFileReport)")]
+        assert "NewMetric" in columns
+
+    def test_delta_sync_falls_back_on_rewritten_source(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """Rows removed from the source are detected and the copy is rebuilt."""
+        src = temp_dir / "source.sqlite"
+        shutil.copy(test_db_paths["mqqc"], src)
+        dest = temp_dir / "synced.sqlite"
+        sync_database(str(src), str(dest))
+
+        with closing(sqlite3.connect(str(src))) as con:
+            con.execute("DELETE FROM SingleFileReport WHERE rowid = (SELECT MIN(rowid) FROM SingleFileReport)")
+            con.commit()
+
+        assert _delta_sync(str(src), str(dest)) is None
+        assert sync_database(str(src), str(dest), delta=True) is True
+        with closing(sqlite3.connect(str(src))) as s, closing(sqlite3.connect(str(dest))) as d:
+            query = "SELECT COUNT(*) FROM SingleFileReport"
+            assert s.execute(query).fetchone() == d.execute(query).fetchone()
+
+    def test_full_sync_of_external_sources_ignores_delta(self) -> None:
+        """sync_external_sources(full=True) makes full backups also with DeltaSyncMQQC (startup and nightly)."""
+        with patch("ProjectQCDashboard.db.SyncDatabases.DeltaSyncMQQC", True), \
+                patch("ProjectQCDashboard.db.SyncDatabases.sync_database", return_value=True) as sync:
+            assert sync_external_sources() == {"mqqc": True, "meta": True}
+            assert [call.kwargs.get("delta", False) for call in sync.call_args_list].count(True) == 1
+
+            sync.reset_mock()
+            assert sync_external_sources(full=True) == {"mqqc": True, "meta": True}
+            assert not any(call.kwargs.get("delta", False) for call in sync.call_args_list)
+
+    def test_concurrent_sync_reports_any_failure(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """Pairs synced in parallel are all attempted, and one failing pair makes the result False."""
+        dest_mqqc = temp_dir / "mqqc_copy.sqlite"
+        dest_meta = temp_dir / "meta_copy.sqlite"
+
+        with patch("ProjectQCDashboard.db.SyncDatabases.SyncWorkers", 3):
+            result = sync_database(
+                [str(test_db_paths["mqqc"]), str(temp_dir / "nonexistent.sqlite"), str(test_db_paths["meta"])],
+                [str(dest_mqqc), str(temp_dir / "dest.sqlite"), str(dest_meta)],
+            )
+
+        assert result is False
+        assert dest_mqqc.exists()
+        assert dest_meta.exists()
+
+    def test_sync_concurrently_returns_result_per_name(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """sync_concurrently runs each named sync and returns its result under the same name."""
+        result = sync_concurrently({
+            "mqqc": partial(sync_database, str(test_db_paths["mqqc"]), str(temp_dir / "mqqc_copy.sqlite")),
+            "missing": partial(sync_database, str(temp_dir / "nonexistent.sqlite"), str(temp_dir / "dest.sqlite")),
+        })
+
+        assert result == {"mqqc": True, "missing": False}
+
+    def test_chunked_backup_records_metrics(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """A backup in small steps copies everything and exports its duration and throughput as metrics."""
+        dest = temp_dir / "synced.sqlite"
+        source = test_db_paths["mqqc"].name
+        syncs_before = SYNC_SECONDS.count(source=source, mode="full")
+        with patch("ProjectQCDashboard.db.SyncDatabases.BackupPagesPerStep", 2), \
+                patch("ProjectQCDashboard.db.SyncDatabases.BackupSleepSeconds", 0):
+            assert sync_database(str(test_db_paths["mqqc"]), str(dest)) is True
+
+        with closing(sqlite3.connect(str(test_db_paths["mqqc"]))) as src, closing(sqlite3.connect(":memory:")) as dst:
+            assert _throttled_backup(src, dst, str(test_db_paths["mqqc"]), pages=2, sleep=0)["steps"] > 1
+        assert SYNC_SECONDS.count(source=source, mode="full") == syncs_before + 1
+        assert SYNC_THROUGHPUT.value(source=source) > 0
+        with closing(sqlite3.connect(str(test_db_paths["mqqc"]))) as src, closing(sqlite3.connect(str(dest))) as dst:
+            query = "SELECT COUNT(*) FROM SingleFileReport"
+            assert src.execute(query).fetchone() == dst.execute(query).fetchone()
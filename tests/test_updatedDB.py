@@ -1,6 +1,7 @@
 """Tests for UpdateDB module — DuckDBUpdater creates and incrementally updates the merged DuckDB."""
 
 import duckdb
+import json
 from unittest.mock import patch
 from ProjectQCDashboard.db.UpdateDB import DuckDBUpdater
 from pathlib import Path
@@ -110,6 +111,21 @@ class TestCreateInitialDatabase:
         index_names = [r[0] for r in indexes]
         assert "idx_project" in index_names
 
+    def test_metric_columns_stored_as_double(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """Plotted metrics are typed DOUBLE in project_data even though MQQC stores them as TEXT."""
+        db_path = temp_dir / "merged.db"
+        updater = DuckDBUpdater([str(test_db_paths["mqqc"])], str(test_db_paths["meta"]))
+
+        with patch("ProjectQCDashboard.db.UpdateDB.MergedDuckDB", str(db_path)):
+            updater.create_initial_database()
+
+        with duckdb.connect(str(db_path)) as con:
+            types = dict((r[0], r[1]) for r in con.execute("DESCRIBE project_data").fetchall())
+        assert types["Protein"] == "DOUBLE"
+        assert types["Protein_iQC"] == "DOUBLE"
+        assert types["InitialPressure_Pump"] == "DOUBLE"
+        assert types["Name"] == "VARCHAR"
+
     def test_create_initial_is_idempotent(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
         """Calling create_initial_database() twice does not raise (IF NOT EXISTS guard)."""
         db_path = temp_dir / "merged.db"
@@ -239,11 +255,198 @@ class TestIncrementalUpdate:
         changed = [k for k in before if after[k] != before[k]]
         assert len(changed) == 1                            # exactly one row moved
         row = changed[0]
-        assert after[row][METRIC_COL] == new_value          # ...to the value we set
+        assert after[row][METRIC_COL] == float(new_value)   # ...to the value we set, stored as DOUBLE
         assert {c: v for c, v in after[row].items() if c != METRIC_COL} == \
             {c: v for c, v in before[row].items() if c != METRIC_COL}  # rest of that row intact
 
 
+
+class TestMaintenance:
+    """Tests for DuckDBUpdater.run_maintenance() — compaction and rebuild recorded in meta_data."""
+
+    def test_maintenance_is_recorded_in_meta_data(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        db_path = temp_dir / "merged.db"
+        updater = DuckDBUpdater([str(test_db_paths["mqqc"])], str(test_db_paths["meta"]))
+
+        with patch("ProjectQCDashboard.db.UpdateDB.MergedDuckDB", str(db_path)):
+            updater.create_initial_database()
+            updater.update_db()
+            result = updater.run_maintenance("rebuild")
+
+        assert result["mode"] == "rebuild"
+        assert result["bytes_reclaimed"] == result["bytes_before"] - result["bytes_after"]
+        with duckdb.connect(str(db_path)) as con:
+            row = con.execute("SELECT row_count, maintenance FROM meta_data ORDER BY updated_at DESC LIMIT 1").fetchone()
+            rows = con.execute("SELECT COUNT(*) FROM project_data").fetchone()
+        assert row is not None and rows is not None
+        assert row[0] == rows[0]
+        assert json.loads(row[1])["mode"] == "rebuild"
+
+    def test_rebuilds_keep_maintenance_history(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """A rebuild replaces project_data only; earlier meta_data rows, maintenance included, stay."""
+        db_path = temp_dir / "merged.db"
+        updater = DuckDBUpdater([str(test_db_paths["mqqc"])], str(test_db_paths["meta"]))
+        with patch("ProjectQCDashboard.db.UpdateDB.MergedDuckDB", str(db_path)):
+            updater.create_initial_database()
+            updater.run_maintenance("rebuild")
+            updater.run_maintenance("rebuild")
+
+        with duckdb.connect(str(db_path)) as con:
+            result = con.execute("SELECT COUNT(*) FROM meta_data WHERE maintenance IS NOT NULL").fetchone()
+        assert result is not None and result[0] == 2
+
+    def test_maintenance_is_not_reported_as_data_update(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """The data freshness shows the last merge, not the nightly rebuild or checkpoint."""
+        from ProjectQCDashboard.ui.processDataForFig import get_data_freshness
+        db_path = temp_dir / "merged.db"
+        updater = DuckDBUpdater([str(test_db_paths["mqqc"])], str(test_db_paths["meta"]))
+        with patch("ProjectQCDashboard.db.UpdateDB.MergedDuckDB", str(db_path)), \
+                patch("ProjectQCDashboard.db.database.MergedDuckDB", str(db_path)):
+            updater.create_initial_database()
+            updater.update_db()
+            last_update, _ = get_data_freshness()
+            assert last_update
+            updater.run_maintenance("rebuild")
+            updater.run_maintenance("checkpoint")
+
+            assert get_data_freshness()[0] == last_update
+
+    def test_checkpoint_on_database_without_maintenance_column(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """A merged DB created before the maintenance column existed gets the column added."""
+        db_path = temp_dir / "merged.db"
+        updater = DuckDBUpdater([str(test_db_paths["mqqc"])], str(test_db_paths["meta"]))
+        with patch("ProjectQCDashboard.db.UpdateDB.MergedDuckDB", str(db_path)):
+            updater.create_initial_database()
+            with duckdb.connect(str(db_path)) as con:
+                con.execute("ALTER TABLE meta_data DROP COLUMN maintenance")
+            updater.run_maintenance("checkpoint")
+
+        with duckdb.connect(str(db_path)) as con:
+            result = con.execute("SELECT COUNT(*) FROM meta_data WHERE maintenance IS NOT NULL").fetchone()
+        assert result is not None and result[0] == 1
+
+
+class TestMergeProfiling:
+    """Tests for the merge profiling switch (ProjectQCDashboard.db.profiling)."""
+
+    def test_profiles_and_summaries_are_saved_and_pruned(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """Each merge writes a DuckDB JSON profile and a summary; only the newest ProfilesKept stay."""
+        db_path = temp_dir / "merged.db"
+        profile_dir = temp_dir / "profiles"
+        updater = DuckDBUpdater([str(test_db_paths["mqqc"])], str(test_db_paths["meta"]))
+
+        with patch("ProjectQCDashboard.db.UpdateDB.MergedDuckDB", str(db_path)), \
+             patch("ProjectQCDashboard.db.profiling.ProfileMerges", True), \
+             patch("ProjectQCDashboard.db.profiling.PROFILE_DIR", profile_dir), \
+             patch("ProjectQCDashboard.db.profiling.ProfilesKept", 2):
+            updater.create_initial_database()
+            updater.update_db()
+            updater.update_db()
+
+        profiles = sorted(profile_dir.glob("*.profile.json"))
+        summaries = sorted(profile_dir.glob("*.summary.json"))
+        assert len(profiles) == 2 and len(summaries) == 2
+        assert all(p.name.startswith("merge_incremental_") for p in profiles)
+
+        summary = json.loads(summaries[-1].read_text())
+        assert summary["slowest_operators"]
+        timings = [op["timing_s"] for op in summary["slowest_operators"]]
+        assert timings == sorted(timings, reverse=True)
+
+    def test_profiling_off_writes_nothing(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """Without the switch no profile directory is created."""
+        profile_dir = temp_dir / "profiles"
+        updater = DuckDBUpdater([str(test_db_paths["mqqc"])], str(test_db_paths["meta"]))
+
+        with patch("ProjectQCDashboard.db.UpdateDB.MergedDuckDB", str(temp_dir / "merged.db")), \
+             patch("ProjectQCDashboard.db.profiling.ProfileMerges", False), \
+             patch("ProjectQCDashboard.db.profiling.PROFILE_DIR", profile_dir):
+            updater.create_initial_database()
+
+        assert not profile_dir.exists()
+
+
+class TestStaging:
+    """Tests for DuckDBUpdater with staging=True — merges from native DuckDB copies of the sources."""
+
+    def _rows(self, db_path: Path) -> list[Any]:
+        with duckdb.connect(str(db_path)) as con:
+            return con.execute("SELECT * FROM project_data ORDER BY RawFileName").fetchall()
+
+    def test_staging_matches_attached_sources(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """The merge built from staging tables equals the merge built from the attached SQLite files."""
+        attached_db = temp_dir / "attached.db"
+        staged_db = temp_dir / "staged.db"
+
+        with patch("ProjectQCDashboard.db.UpdateDB.MergedDuckDB", str(attached_db)):
+            DuckDBUpdater([str(test_db_paths["mqqc"])], str(test_db_paths["meta"])).create_initial_database()
+        with patch("ProjectQCDashboard.db.UpdateDB.MergedDuckDB", str(staged_db)):
+            DuckDBUpdater([str(test_db_paths["mqqc"])], str(test_db_paths["meta"]), staging=True).create_initial_database()
+
+        assert self._rows(staged_db) == self._rows(attached_db)
+        with duckdb.connect(str(staged_db)) as con:
+            schemas = {r[0] for r in con.execute("SELECT schema_name FROM duckdb_schemas() WHERE database_name = current_database()").fetchall()}
+        assert {"mqqc0", "meta_all"} <= schemas
+
+    def test_unchanged_sources_are_not_staged_again(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """Only a source whose fingerprint changed is copied again; the source itself is not written."""
+        mqqc = temp_dir / "mqqc.sqlite"
+        shutil.copy(test_db_paths["mqqc"], mqqc)
+        db_path = temp_dir / "merged.db"
+        updater = DuckDBUpdater([str(mqqc)], str(test_db_paths["meta"]), staging=True)
+
+        with patch("ProjectQCDashboard.db.UpdateDB.MergedDuckDB", str(db_path)):
+            updater.create_initial_database()
+        assert updater.sources_changed() == []
+
+        with closing(sqlite3.connect(mqqc)) as con:
+            with con:
+                con.execute("UPDATE SingleFileReport SET Protein = '99999' WHERE rowid = 1")
+        assert updater.sources_changed() == [str(mqqc)]
+
+        mtime = mqqc.stat().st_mtime_ns
+        with duckdb.connect(str(db_path)) as con:
+            con.execute("LOAD sqlite_scanner")
+            assert updater.refresh_staging(con) == [str(mqqc)]
+        assert mqqc.stat().st_mtime_ns == mtime
+        assert updater.sources_changed() == []
+
+    def test_changed_source_only_appends_new_rows(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """New rows and edits in the tail window are appended without a full copy, giving the same staging tables."""
+        mqqc = temp_dir / "mqqc.sqlite"
+        shutil.copy(test_db_paths["mqqc"], mqqc)
+        db_path = temp_dir / "merged.db"
+        updater = DuckDBUpdater([str(mqqc)], str(test_db_paths["meta"]), staging=True)
+        with patch("ProjectQCDashboard.db.UpdateDB.MergedDuckDB", str(db_path)):
+            updater.create_initial_database()
+
+        with closing(sqlite3.connect(mqqc)) as con:
+            with con:
+                last_rowid = con.execute("SELECT MAX(rowid) FROM SingleFileReport").fetchone()[0]
+                con.execute("UPDATE SingleFileReport SET Protein = '1234.5' WHERE rowid = ?", (last_rowid,))
+                con.execute("INSERT INTO SingleFileReport (Name, Protein) VALUES ('new_sample', '42')")
+
+        with duckdb.connect(str(db_path)) as con:
+            con.execute("LOAD sqlite_scanner")
+            with patch.object(updater, "_copy_staging", wraps=updater._copy_staging) as full_copy:
+                assert updater.refresh_staging(con) == [str(mqqc)]
+            full_copy.assert_not_called()
+
+            staged = con.execute("SELECT * FROM mqqc0_raw.SingleFileReport ORDER BY _rowid").fetchall()
+            con.execute(f"ATTACH '{mqqc}' AS src (TYPE SQLITE, READ_ONLY)")
+            source = con.execute("SELECT rowid, * FROM src.SingleFileReport ORDER BY rowid").fetchall()
+        assert staged == source
+
+    def test_attached_mode_drops_staging_schemas(self, temp_dir: Path, test_db_paths: dict[str, Path]) -> None:
+        """Switching back from staging to attached sources still merges (no ambiguous names)."""
+        db_path = temp_dir / "merged.db"
+        with patch("ProjectQCDashboard.db.UpdateDB.MergedDuckDB", str(db_path)):
+            DuckDBUpdater([str(test_db_paths["mqqc"])], str(test_db_paths["meta"]), staging=True).create_initial_database()
+            DuckDBUpdater([str(test_db_paths["mqqc"])], str(test_db_paths["meta"])).update_db()
+
+        assert len(self._rows(db_path)) > 0
+
+
 def test_iqc_alignment_and_dedup(iqc_sources: tuple[str, str, str]) -> None:
     mqqc, meta, merged = iqc_sources
 